@@ -5,6 +5,7 @@ Example script showing how to integrate MailProbe-Py into other applications.
 This demonstrates the object-oriented API and various usage patterns.
 """
 
+import re
 import sys
 from pathlib import Path
 
@@ -158,6 +159,7 @@ def advanced_integration_example():
             self.spam_filter = MailProbeAPI(database_path)
             self.processed_count = 0
             self.spam_count = 0
+            self._whitelist_patterns = {}
 
         def process_email(self, email_content, sender_whitelist=None):
             """Process an email with email classifiering and whitelisting."""
@@ -208,11 +210,16 @@ def advanced_integration_example():
 
         def _is_whitelisted(self, email_content, whitelist):
             """Check if sender is whitelisted."""
-            # Simple whitelist check (in practice, you'd parse headers properly)
-            for domain in whitelist:
-                if f"@{domain}" in email_content:
-                    return True
-            return False
+            # Simple whitelist check (in practice, you'd parse headers properly).
+            # All domains are matched by one compiled alternation, so the
+            # content is scanned once however long the whitelist is.
+            key = tuple(whitelist)
+            pattern = self._whitelist_patterns.get(key)
+            if pattern is None:
+                domains = "|".join(re.escape(domain) for domain in whitelist)
+                pattern = re.compile(f"@(?:{domains})")
+                self._whitelist_patterns[key] = pattern
+            return pattern.search(email_content) is not None
 
         def close(self):
             """Clean up resources."""
@@ -7,6 +7,7 @@ into multiple categories beyond just spam/not-spam, such as different
 folders or types of emails.
 """
 
+import re
 import shutil
 import sys
 import tempfile
@@ -22,6 +23,15 @@ from mailprobe import (
     train_from_folder_structure,
 )
 
+# Matches the Subject header line of a raw email
+SUBJECT_PATTERN = re.compile(r"^Subject:[ \t]*([^\r\n]*)", re.MULTILINE)
+
+
+def get_subject(email_content):
+    """Extract the subject line from raw email content for display."""
+    match = SUBJECT_PATTERN.search(email_content)
+    return match.group(1) if match else ""
+
 
 def basic_multi_category_example():
     """Demonstrate basic multi-category classification."""
@@ -231,7 +241,7 @@ def advanced_multi_category_example():
         print("\nClassifying ambiguous emails:")
         for email in ambiguous_emails:
             result = classifier.classify(email, return_all_scores=True)
-            print(f"\nEmail: {email.split('Subject: ')[1].split('\\n')[0]}")
+            print(f"\nEmail: {get_subject(email)}")
             print(
                 f"Classified as: {result.category} (confidence: {result.confidence:.3f})"
             )
@@ -270,7 +280,7 @@ def convenience_functions_example():
     # Note: This would need pre-trained data to work effectively
     print("Using convenience function for quick classification:")
     print(f"Categories: {categories}")
-    print(f"Email: {email_content.split('Subject: ')[1].split('\\n')[0]}")
+    print(f"Email: {get_subject(email_content)}")
 
     # In practice, you'd need to train the categories first
     print("(Note: Convenience functions work best with pre-trained categories)")
@@ -346,7 +356,7 @@ def email_routing_example():
         print("Email routing results:")
         for email in test_emails:
             routing = router.route_email(email)
-            subject = email.split("Subject: ")[1].split("\\n")[0]
+            subject = get_subject(email)
             print(
                 f"  '{subject}' → {routing['folder']} (confidence: {routing['confidence']:.3f})"
             )
@@ -5,25 +5,54 @@ Convenient test runner for MailProbe-Py.
 This script provides an easy way to run tests with various options.
 """
 
+import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
+# Local runs never use --lf/--ff, so skip writing .pytest_cache
+FAST_LOCAL = ["-p", "no:cacheprovider"]
 
-def run_command(cmd, description):
-    """Run a command and report results."""
+
+def pytest_command(*args):
+    """Build a pytest command that spreads tests over all CPUs with pytest-xdist.
+
+    ``--dist=loadfile`` keeps each test module on a single worker so tests
+    sharing temporary databases within a file never contend with each other.
+    pytest-cov combines the per-worker coverage data itself.
+    """
+    return ["poetry", "run", "pytest", "-n", "auto", "--dist=loadfile", *args]
+
+
+def print_header(cmd, description):
+    """Print the banner shown before each command."""
     print(f"\n{'='*60}")
     print(f"Running: {description}")
     print(f"Command: {' '.join(cmd)}")
     print("=" * 60)
 
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=False)
+
+def run_command(cmd, description):
+    """Run a command and report results."""
+    print_header(cmd, description)
+
+    returncode = subprocess.call(cmd)
+    if returncode == 0:
         print(f"✅ {description} completed successfully")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed with exit code {e.returncode}")
-        return False
+    print(f"❌ {description} failed with exit code {returncode}")
+    return False
+
+
+def exec_command(cmd, description):
+    """Replace this process with a single command, passing on its exit code."""
+    print_header(cmd, description)
+    sys.stdout.flush()
+    if not shutil.which(cmd[0]):
+        print(f"❌ {description} failed: {cmd[0]} not found")
+        sys.exit(1)
+    os.execvp(cmd[0], cmd)
 
 
 def main():
@@ -41,59 +70,66 @@ def main():
 
     success = True
 
-    if test_type in ["all", "quick"]:
-        # Run all tests
-        success &= run_command(["poetry", "run", "pytest", "-v"], "All Tests")
-
-    if test_type in ["all", "coverage"]:
-        # Run tests with coverage
+    if test_type == "all":
+        # Run all tests once, producing both coverage reports
         success &= run_command(
-            [
-                "poetry",
-                "run",
-                "pytest",
+            pytest_command(
+                "-v",
                 "--cov=src/mailprobe",
                 "--cov-report=term-missing",
-            ],
+                "--cov-report=html",
+            ),
+            "All Tests + Coverage",
+        )
+
+    if test_type == "quick":
+        # Run all tests with minimal terminal output
+        exec_command(
+            pytest_command(*FAST_LOCAL, "-q", "--no-header", "--no-summary"),
+            "Quick Tests",
+        )
+
+    if test_type == "coverage":
+        # Run tests with coverage
+        success &= run_command(
+            pytest_command("--cov=src/mailprobe", "--cov-report=term-missing"),
             "Tests with Coverage Report",
         )
 
-    if test_type in ["all", "html"]:
+    if test_type == "html":
         # Generate HTML coverage report
         success &= run_command(
-            ["poetry", "run", "pytest", "--cov=src/mailprobe", "--cov-report=html"],
+            pytest_command("--cov=src/mailprobe", "--cov-report=html"),
             "HTML Coverage Report Generation",
         )
 
-        if success:
-            html_report = project_root / "htmlcov" / "index.html"
-            if html_report.exists():
-                print(f"\n📊 HTML coverage report available at: {html_report}")
+    if test_type in ["all", "html"] and success:
+        html_report = project_root / "htmlcov" / "index.html"
+        if html_report.exists():
+            print(f"\n📊 HTML coverage report available at: {html_report}")
 
     if test_type == "api":
         # Run only API tests
-        success &= run_command(
-            ["poetry", "run", "pytest", "tests/test_api.py", "-v"], "API Tests Only"
+        exec_command(
+            pytest_command(*FAST_LOCAL, "tests/test_api.py", "-v"), "API Tests Only"
         )
 
     if test_type == "cli":
         # Run only CLI tests
-        success &= run_command(
-            ["poetry", "run", "pytest", "tests/test_cli.py", "-v"], "CLI Tests Only"
+        exec_command(
+            pytest_command(*FAST_LOCAL, "tests/test_cli.py", "-v"), "CLI Tests Only"
         )
 
     if test_type == "core":
         # Run core functionality tests
-        success &= run_command(
-            [
-                "poetry",
-                "run",
-                "pytest",
+        exec_command(
+            pytest_command(
+                *FAST_LOCAL,
                 "tests/test_filter.py",
                 "tests/test_database.py",
                 "tests/test_tokenizer.py",
                 "-v",
-            ],
+            ),
             "Core Functionality Tests",
         )
 
@@ -103,33 +139,24 @@ def main():
         print("Running Code Quality Checks")
         print("=" * 60)
 
-        # Check if tools are available
-        try:
-            success &= run_command(
-                ["poetry", "run", "black", "--check", "src/", "tests/"],
-                "Black Code Formatting Check",
-            )
-        except FileNotFoundError:
-            print("⚠️  Black not available, skipping formatting check")
-
-        try:
+        if shutil.which("pre-commit"):
+            # One pre-commit process runs every hook in .pre-commit-config.yaml
             success &= run_command(
-                ["poetry", "run", "isort", "--check-only", "src/", "tests/"],
-                "Import Sorting Check",
+                ["pre-commit", "run", "--all-files"], "Pre-commit Hooks"
             )
-        except FileNotFoundError:
-            print("⚠️  isort not available, skipping import check")
-
-        try:
-            success &= run_command(
-                ["poetry", "run", "flake8", "src/", "tests/"], "Flake8 Linting Check"
-            )
-        except FileNotFoundError:
-            print("⚠️  flake8 not available, skipping linting check")
+        elif shutil.which("poetry"):
+            for cmd, description in [
+                (["black", "--check", "src/", "tests/"], "Black Code Formatting Check"),
+                (["isort", "--check-only", "src/", "tests/"], "Import Sorting Check"),
+                (["flake8", "src/", "tests/"], "Flake8 Linting Check"),
+            ]:
+                success &= run_command(["poetry", "run", *cmd], description)
+        else:
+            print("⚠️  Neither pre-commit nor poetry available, skipping lint checks")
 
     if test_type == "integration":
         # Run integration test
-        success &= run_command(
+        exec_command(
             ["poetry", "run", "python", "examples/integration_example.py"],
             "Integration Example Test",
         )
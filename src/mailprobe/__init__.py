@@ -44,36 +44,89 @@ For convenience functions:
 __version__ = "0.1.0"
 __author__ = "Peter Bowen"
 
-# High-level API (recommended for integration)
-from .api import (
-    BatchMailFilter,
-    ClassificationResult,
-    MailProbeAPI,
-    TrainingResult,
-    classify_email,
-    get_spam_probability,
-    train_from_directories,
-)
-from .config import ConfigManager, MailProbeConfig
-from .database import WordData, WordDatabase
-
-# Low-level components (for advanced usage)
-from .filter import FilterConfig, MailFilter, MailScore
-from .message import EmailMessage, EmailMessageReader
-
-# Multi-category classification
-from .multi_category import (
-    CategoryResult,
-    CategoryTrainingResult,
-    FolderBasedClassifier,
-    MultiCategoryFilter,
-    classify_into_categories,
-    train_from_folder_structure,
-)
-from .tokenizer import EmailTokenizer, Token
-
-# Utilities
-from .utils import get_default_database_path, is_windows, normalize_path
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    # High-level API (recommended for integration)
+    from .api import (
+        BatchMailFilter,
+        ClassificationResult,
+        MailProbeAPI,
+        TrainingResult,
+        classify_email,
+        get_spam_probability,
+        train_from_directories,
+    )
+    from .config import ConfigManager, MailProbeConfig
+    from .database import WordData, WordDatabase
+
+    # Low-level components (for advanced usage)
+    from .filter import FilterConfig, MailFilter, MailScore
+    from .message import EmailMessage, EmailMessageReader
+
+    # Multi-category classification
+    from .multi_category import (
+        CategoryResult,
+        CategoryTrainingResult,
+        FolderBasedClassifier,
+        MultiCategoryFilter,
+        classify_into_categories,
+        train_from_folder_structure,
+    )
+    from .tokenizer import EmailTokenizer, Token
+
+    # Utilities
+    from .utils import get_default_database_path, is_windows, normalize_path
+
+# Submodule providing each public name. The submodules are imported on
+# first attribute access (PEP 562), so "import mailprobe" stays cheap for
+# scripts that only use part of the package.
+_LAZY_IMPORTS: Dict[str, str] = {
+    "BatchMailFilter": "api",
+    "ClassificationResult": "api",
+    "MailProbeAPI": "api",
+    "TrainingResult": "api",
+    "classify_email": "api",
+    "get_spam_probability": "api",
+    "train_from_directories": "api",
+    "ConfigManager": "config",
+    "MailProbeConfig": "config",
+    "WordData": "database",
+    "WordDatabase": "database",
+    "FilterConfig": "filter",
+    "MailFilter": "filter",
+    "MailScore": "filter",
+    "EmailMessage": "message",
+    "EmailMessageReader": "message",
+    "CategoryResult": "multi_category",
+    "CategoryTrainingResult": "multi_category",
+    "FolderBasedClassifier": "multi_category",
+    "MultiCategoryFilter": "multi_category",
+    "classify_into_categories": "multi_category",
+    "train_from_folder_structure": "multi_category",
+    "EmailTokenizer": "tokenizer",
+    "Token": "tokenizer",
+    "get_default_database_path": "utils",
+    "is_windows": "utils",
+    "normalize_path": "utils",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names from their submodule on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     # High-level API
@@ -5,9 +5,13 @@ This module provides a clean, easy-to-use interface for integrating
 MailProbe-Py into other applications and scripts.
 """
 
+import csv
+import hashlib
 import shutil
 import tempfile
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
@@ -15,7 +19,10 @@ from .config import ConfigManager, MailProbeConfig
 from .database import WordDatabase
 from .filter import FilterConfig, MailFilter, MailScore
 from .message import EmailMessage, EmailMessageReader
-from .utils import get_default_database_path, normalize_path
+from .utils import get_default_database_path, is_message_text, normalize_path
+
+# Buffer size for backup files, which hold one line per stored term
+_IO_BUFFER_SIZE = 65536
 
 
 @dataclass
@@ -77,6 +84,7 @@ class MailProbeAPI:
         database_path: Optional[Union[str, Path]] = None,
         config: Optional[Union[MailProbeConfig, FilterConfig, Dict[str, Any]]] = None,
         auto_create: bool = True,
+        classify_cache_size: int = 0,
     ):
         """
         Initialize MailProbe API.
@@ -85,6 +93,10 @@ class MailProbeAPI:
             database_path: Path to database directory (default: ~/.mailprobe-py)
             config: Configuration object or dictionary
             auto_create: Automatically create database if it doesn't exist
+            classify_cache_size: Number of classify_text results to memoize
+                (0, the default, disables the cache). Memoized results only
+                follow changes made through this API object, so enable it
+                only where nothing else trains the database.
         """
         # Set up database path
         if database_path is None:
@@ -112,6 +124,12 @@ class MailProbeAPI:
         self._filter: Optional[MailFilter] = None
         self._message_reader = EmailMessageReader()
 
+        # classify_text results keyed on a hash of the raw content; cleared
+        # whenever the database is changed through this API
+        self.classify_cache_size = classify_cache_size
+        self._classify_cache: Dict[bytes, ClassificationResult] = {}
+        self._classify_lock = threading.Lock()
+
     @property
     def filter(self) -> MailFilter:
         """Get the mail filter instance (lazy initialization)."""
@@ -136,18 +154,7 @@ class MailProbeAPI:
         """
         message = self._get_message(message_source)
         score = self.filter.score_message(message)
-
-        if return_details:
-            return ClassificationResult(
-                is_spam=score.is_spam,
-                probability=score.probability,
-                confidence=score.confidence,
-                terms_used=score.terms_used,
-                digest=message.digest,
-                top_terms=score.top_terms,
-            )
-        else:
-            return score.is_spam
+        return self._make_result(message, score, return_details)
 
     def classify_text(
         self, email_content: str, return_details: bool = False
@@ -155,6 +162,11 @@ class MailProbeAPI:
         """
         Classify email content as spam or not spam.
 
+        With ``classify_cache_size`` set, results are memoized on a hash
+        of the content, so repeated deliveries of the same email skip
+        tokenization and scoring until the database is next modified
+        through this API.
+
         Args:
             email_content: Raw email message content
             return_details: If True, return detailed ClassificationResult
@@ -162,8 +174,46 @@ class MailProbeAPI:
         Returns:
             bool (is_spam) if return_details=False, ClassificationResult otherwise
         """
-        message = EmailMessage(email_content)
-        return self.classify(message, return_details)
+        if self.classify_cache_size <= 0:
+            message = EmailMessage(email_content)
+            score = self.filter.score_message(message)
+            return self._make_result(message, score, return_details)
+
+        key = hashlib.blake2b(
+            email_content.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+
+        result = self._classify_cache.get(key)
+        if result is None:
+            message = EmailMessage(email_content)
+            score = self.filter.score_message(message)
+            result = cast(ClassificationResult, self._make_result(message, score, True))
+
+            with self._classify_lock:
+                cache = self._classify_cache
+                if len(cache) >= self.classify_cache_size:
+                    # Remove oldest entry (simple FIFO eviction)
+                    del cache[next(iter(cache))]
+                cache[key] = result
+
+        if return_details:
+            return replace(result, top_terms=list(result.top_terms))
+        return result.is_spam
+
+    def _clear_classify_cache(self) -> None:
+        """Drop memoized classify_text results after a database change."""
+        with self._classify_lock:
+            self._classify_cache.clear()
+
+    def freeze(self) -> None:
+        """
+        Precompute word probabilities for fast repeated classification.
+
+        Useful once training is finished, e.g. after restoring a backup.
+        Classification then no longer queries the database; training or
+        otherwise modifying the database through this API unfreezes it.
+        """
+        self.filter.freeze()
 
     def get_spam_probability(
         self, message_source: Union[str, Path, EmailMessage]
@@ -233,6 +283,7 @@ class MailProbeAPI:
             True if database was updated
         """
         message = self._get_message(message_source)
+        self._clear_classify_cache()
         return self.filter.train_message(message, is_spam, force_update)
 
     def train_selective(
@@ -251,6 +302,7 @@ class MailProbeAPI:
         messages = self._get_messages_from_source(source)
         processed = 0
         updated = 0
+        self._clear_classify_cache()
 
         for message in messages:
             processed += 1
@@ -274,6 +326,7 @@ class MailProbeAPI:
             True if message was found and removed
         """
         message = self._get_message(message_source)
+        self._clear_classify_cache()
         return self.filter.remove_message(message)
 
     def get_database_stats(self) -> Dict[str, Any]:
@@ -296,6 +349,7 @@ class MailProbeAPI:
         Returns:
             Number of words removed
         """
+        self._clear_classify_cache()
         return self.filter.cleanup_database(max_count, max_age_days)
 
     def export_database(self) -> List[Tuple[str, int, int]]:
@@ -317,6 +371,7 @@ class MailProbeAPI:
         Returns:
             Number of words imported
         """
+        self._clear_classify_cache()
         return self.filter.import_database(data)
 
     def backup_database(self, backup_path: Union[str, Path]) -> None:
@@ -332,10 +387,12 @@ class MailProbeAPI:
         # Export data and save as CSV
         data = self.export_database()
 
-        with open(backup_path, "w") as f:
+        with open(
+            backup_path, "w", newline="", encoding="utf-8", buffering=_IO_BUFFER_SIZE
+        ) as f:
             f.write("term,good_count,spam_count\n")
-            for term, good_count, spam_count in data:
-                f.write(f'"{term}",{good_count},{spam_count}\n')
+            writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+            writer.writerows(data)
 
     def restore_database(self, backup_path: Union[str, Path]) -> int:
         """
@@ -347,26 +404,23 @@ class MailProbeAPI:
         Returns:
             Number of words imported
         """
-        import csv
-
         backup_path = Path(backup_path)
-        data = []
 
-        with open(backup_path, "r") as f:
+        with open(
+            backup_path, "r", newline="", encoding="utf-8", buffering=_IO_BUFFER_SIZE
+        ) as f:
             reader = csv.reader(f)
             next(reader)  # Skip header
 
-            for row in reader:
-                if len(row) >= 3:
-                    term = row[0].strip('"')
-                    good_count = int(row[1])
-                    spam_count = int(row[2])
-                    data.append((term, good_count, spam_count))
+            data = [
+                (row[0], int(row[1]), int(row[2])) for row in reader if len(row) >= 3
+            ]
 
         return self.import_database(data)
 
     def reset_database(self) -> None:
         """Reset the database (remove all data)."""
+        self._clear_classify_cache()
         if self._filter:
             self._filter.close()
             self._filter = None
@@ -378,10 +432,27 @@ class MailProbeAPI:
 
     def close(self) -> None:
         """Close the email classifier and database connections."""
+        self._clear_classify_cache()
         if self._filter:
             self._filter.close()
             self._filter = None
 
+    def _make_result(
+        self, message: EmailMessage, score: MailScore, return_details: bool
+    ) -> Union[bool, ClassificationResult]:
+        """Convert a MailScore into the requested result type."""
+        if return_details:
+            return ClassificationResult(
+                is_spam=score.is_spam,
+                probability=score.probability,
+                confidence=score.confidence,
+                terms_used=score.terms_used,
+                digest=message.digest,
+                top_terms=score.top_terms,
+            )
+        else:
+            return score.is_spam
+
     def _get_message(
         self, message_source: Union[str, Path, EmailMessage]
     ) -> EmailMessage:
@@ -389,16 +460,16 @@ class MailProbeAPI:
         if isinstance(message_source, EmailMessage):
             return message_source
         elif isinstance(message_source, (str, Path)):
-            path = Path(message_source)
-            if path.exists():
-                # It's a file path
-                messages = list(self._message_reader.read_from_file(path))
-                if not messages:
-                    raise ValueError(f"No messages found in {path}")
-                return messages[0]  # Return first message
-            else:
+            if is_message_text(message_source):
                 # It's email content as string
-                return EmailMessage(str(message_source))
+                return self._message_reader.read_from_string(str(message_source))
+
+            # It's a file path
+            path = Path(message_source)
+            messages = list(self._message_reader.read_from_file(path))
+            if not messages:
+                raise ValueError(f"No messages found in {path}")
+            return messages[0]  # Return first message
         else:
             raise ValueError(f"Invalid message source type: {type(message_source)}")
 
@@ -413,12 +484,11 @@ class MailProbeAPI:
 
         messages: List[EmailMessage] = []
         for src in sources:
-            path = Path(src)
-            if path.exists():
-                messages.extend(self._message_reader.read_from_file(path))
-            else:
+            if is_message_text(src):
                 # Treat as email content
-                messages.append(EmailMessage(str(src)))
+                messages.append(self._message_reader.read_from_string(str(src)))
+            else:
+                messages.extend(self._message_reader.read_from_file(Path(src)))
 
         return messages
 
@@ -430,16 +500,12 @@ class MailProbeAPI:
     ) -> TrainingResult:
         """Train on multiple messages."""
         messages = self._get_messages_from_source(source)
-        processed = 0
-        updated = 0
+        self._clear_classify_cache()
 
-        for message in messages:
-            processed += 1
-            if self.filter.train_message(message, is_spam, force_update):
-                updated += 1
+        updated = self.filter.train_messages(messages, is_spam, force_update)
 
         return TrainingResult(
-            messages_processed=processed,
+            messages_processed=len(messages),
             messages_updated=updated,
             database_updated=updated > 0,
         )
@@ -461,14 +527,24 @@ class BatchMailFilter:
     with features like batch training and parallel processing.
     """
 
-    def __init__(self, api: MailProbeAPI):
+    def __init__(
+        self,
+        api: MailProbeAPI,
+        max_workers: Optional[int] = None,
+        block_size: int = 256,
+    ):
         """
         Initialize batch filter.
 
         Args:
             api: MailProbeAPI instance to use
+            max_workers: Number of threads used to load message sources
+                (1 loads them serially, None uses the executor default)
+            block_size: Number of messages loaded and scored together
         """
         self.api = api
+        self.max_workers = max_workers
+        self.block_size = max(1, block_size)
 
     def classify_batch(
         self, sources: List[Union[str, Path]], return_details: bool = False
@@ -476,6 +552,12 @@ class BatchMailFilter:
         """
         Classify multiple messages in batch.
 
+        Sources are processed in blocks of ``block_size`` so the parsed
+        messages, tokens and word data held at once stay bounded however
+        large the batch is. Loading is dominated by file I/O, which releases
+        the GIL, so unless ``max_workers`` is 1 each block is read on a
+        thread pool while the previous block is being scored.
+
         Args:
             sources: List of message sources (paths or content)
             return_details: If True, return detailed results
@@ -483,28 +565,92 @@ class BatchMailFilter:
         Returns:
             List of classification results
         """
-        results = []
-        for source in sources:
-            try:
-                result = self.api.classify(source, return_details)
-                results.append(result)
-            except Exception as e:
+        results: List[Union[bool, ClassificationResult]] = []
+        blocks = [
+            sources[start : start + self.block_size]
+            for start in range(0, len(sources), self.block_size)
+        ]
+
+        if self.max_workers == 1 or len(sources) <= 1:
+            for block in blocks:
+                loaded = [self._load_message(source) for source in block]
+                results.extend(self._score_block(loaded, return_details))
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = executor.map(self._load_message, blocks[0])
+            for index in range(len(blocks)):
+                loaded = list(pending)
+                if index + 1 < len(blocks):
+                    # Start reading the next block before scoring this one
+                    pending = executor.map(self._load_message, blocks[index + 1])
+                results.extend(self._score_block(loaded, return_details))
+
+        return results
+
+    def _score_block(
+        self, loaded: List[Optional[EmailMessage]], return_details: bool
+    ) -> List[Union[bool, ClassificationResult]]:
+        """Classify one block of loaded messages with a single scoring pass."""
+        results: List[Union[bool, ClassificationResult, None]] = []
+        messages: List[EmailMessage] = []
+        positions: List[int] = []
+
+        for message in loaded:
+            if message is None:
                 # Handle individual failures gracefully
-                if return_details:
-                    results.append(
-                        ClassificationResult(
-                            is_spam=False,
-                            probability=0.5,
-                            confidence=0.0,
-                            terms_used=0,
-                            digest="",
-                            top_terms=[],
-                        )
+                results.append(self._failed_result(return_details))
+            else:
+                positions.append(len(results))
+                messages.append(message)
+                results.append(None)
+
+        # Score all parsed messages in a single pass
+        if messages:
+            try:
+                scores = self.api.filter.score_messages(messages)
+            except Exception:
+                # Score one by one, so only the offending messages fail
+                for position, message in zip(positions, messages):
+                    results[position] = self._score_one(message, return_details)
+            else:
+                for position, message, score in zip(positions, messages, scores):
+                    results[position] = self.api._make_result(
+                        message, score, return_details
                     )
-                else:
-                    results.append(False)
 
-        return results
+        return cast(List[Union[bool, ClassificationResult]], results)
+
+    def _score_one(
+        self, message: EmailMessage, return_details: bool
+    ) -> Union[bool, ClassificationResult]:
+        """Classify a single loaded message, reporting a failure as such."""
+        try:
+            score = self.api.filter.score_message(message)
+        except Exception:
+            return self._failed_result(return_details)
+        return self.api._make_result(message, score, return_details)
+
+    def _load_message(self, source: Union[str, Path]) -> Optional[EmailMessage]:
+        """Load a single message source, returning None on failure."""
+        try:
+            return self.api._get_message(source)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _failed_result(return_details: bool) -> Union[bool, ClassificationResult]:
+        """Result reported for a message that could not be classified."""
+        if return_details:
+            return ClassificationResult(
+                is_spam=False,
+                probability=0.5,
+                confidence=0.0,
+                terms_used=0,
+                digest="",
+                top_terms=[],
+            )
+        return False
 
     def train_batch(
         self,
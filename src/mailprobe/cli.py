@@ -15,6 +15,9 @@ from .config import ConfigManager, MailProbeConfig, get_default_config_path
 from .filter import MailFilter
 from .message import EmailMessage, EmailMessageReader
 
+# Lines written per echo by the dump command
+_DUMP_BATCH_LINES = 1000
+
 # Global configuration object
 _config: Optional[MailProbeConfig] = None
 _config_manager: Optional[ConfigManager] = None
@@ -374,9 +377,17 @@ def dump(ctx, output_format):
         words = spam_filter.export_database()
 
         if output_format == "csv":
+            # Echo in batches of lines: click.echo flushes on every call,
+            # and a single echo would build the whole dump in memory
             click.echo("term,good_count,spam_count")
-            for term, good_count, spam_count in words:
-                click.echo(f'"{term}",{good_count},{spam_count}')
+            for start in range(0, len(words), _DUMP_BATCH_LINES):
+                batch = words[start : start + _DUMP_BATCH_LINES]
+                click.echo(
+                    "\n".join(
+                        f'"{term}",{good_count},{spam_count}'
+                        for term, good_count, spam_count in batch
+                    )
+                )
         elif output_format == "json":
             import json
 
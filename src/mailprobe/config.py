@@ -10,7 +10,7 @@ import os
 import sys
 from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
 
 # Windows-specific imports with proper type handling
 if sys.platform == "win32":
@@ -24,9 +24,11 @@ else:
     ctypes = None  # type: ignore
     wintypes = None  # type: ignore
 
-from .filter import FilterConfig
 from .utils import get_default_database_path, normalize_path, safe_open_text
 
+if TYPE_CHECKING:
+    from .filter import FilterConfig
+
 
 @dataclass
 class DatabaseConfig:
@@ -86,8 +88,17 @@ class MailProbeConfig:
     verbose: bool = False
     debug: bool = False
 
-    def to_filter_config(self) -> FilterConfig:
+    # Last resolved (configured path, created directory) pair
+    _resolved_path: Optional[Tuple[str, Path]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def to_filter_config(self) -> "FilterConfig":
         """Convert to FilterConfig for use with MailFilter."""
+        # Imported here so loading configuration does not pull in the
+        # filter, database and tokenizer modules
+        from .filter import FilterConfig
+
         return FilterConfig(
             # Scoring parameters
             spam_threshold=self.scoring.spam_threshold,
@@ -110,8 +121,17 @@ class MailProbeConfig:
         )
 
     def get_database_path(self) -> Path:
-        """Get the resolved database path."""
-        path = Path(self.database.path).expanduser().resolve()
+        """
+        Get the resolved database path, creating the directory if needed.
+
+        The result is reused until database.path changes, so repeated calls
+        skip path resolution and mkdir.
+        """
+        raw_path = self.database.path
+        if self._resolved_path is not None and self._resolved_path[0] == raw_path:
+            return self._resolved_path[1]
+
+        path = Path(raw_path).expanduser().resolve()
 
         # Handle Windows path length limitations
         if os.name == "nt" and len(str(path)) > 260:
@@ -138,6 +158,7 @@ class MailProbeConfig:
                 path = temp_dir
 
         path.mkdir(parents=True, exist_ok=True)
+        self._resolved_path = (raw_path, path)
         return path
 
 
@@ -160,7 +181,8 @@ class ConfigManager:
             config_file: Optional path to configuration file
         """
         self.config_file = config_file
-        self._config: MailProbeConfig = MailProbeConfig()
+        # Built lazily by load_config() or the first method that needs it
+        self._config: Optional[MailProbeConfig] = None
 
     def load_config(self, config_file: Optional[Path] = None) -> MailProbeConfig:
         """
@@ -175,11 +197,14 @@ class ConfigManager:
         if config_file:
             self.config_file = config_file
 
-        if self.config_file and self.config_file.exists():
-            self._config = self._load_from_file(self.config_file)
-        else:
-            self._config = MailProbeConfig()
+        if self.config_file:
+            try:
+                self._config = self._load_from_file(self.config_file)
+                return self._config
+            except FileNotFoundError:
+                pass
 
+        self._config = MailProbeConfig()
         return self._config
 
     def save_config(
@@ -201,11 +226,13 @@ class ConfigManager:
         # Ensure directory exists
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Convert to dictionary and save as JSON
+        # Convert to dictionary and save as JSON. Serialize to one string
+        # first: json.dump with indent streams many tiny writes to the file.
         config_dict = self._config_to_dict(config)
+        content = json.dumps(config_dict, indent=2)
 
         with safe_open_text(self.config_file, "w") as f:
-            json.dump(config_dict, f, indent=2)
+            f.write(content)
 
     def get_config(self) -> MailProbeConfig:
         """Get current configuration (loads default if not loaded)."""
@@ -273,15 +300,17 @@ class ConfigManager:
         }
 
         if preset_name in presets:
-            presets[preset_name]()
+            presets[preset_name](self._config)
         else:
             raise ValueError(f"Unknown preset: {preset_name}")
 
     def _load_from_file(self, config_file: Path) -> MailProbeConfig:
         """Load configuration from JSON file."""
         try:
-            with safe_open_text(config_file) as f:
-                config_dict = json.load(f)
+            # Read in one call and decoded like safe_open_text would
+            config_dict = json.loads(
+                Path(config_file).read_bytes().decode("utf-8", errors="ignore")
+            )
 
             return self._dict_to_config(config_dict)
         except (json.JSONDecodeError, KeyError, TypeError) as e:
@@ -329,40 +358,40 @@ class ConfigManager:
             current = getattr(current, key)
         setattr(current, path[-1], value)
 
-    def _apply_graham_preset(self) -> None:
+    def _apply_graham_preset(self, config: MailProbeConfig) -> None:
         """Apply Paul Graham's original algorithm settings."""
-        self._config.tokenizer.max_phrase_terms = 1
-        self._config.tokenizer.remove_html = False
-        self._config.tokenizer.min_term_length = 1
-        self._config.tokenizer.max_term_length = 90
-        self._config.tokenizer.header_mode = "all"
-
-        self._config.scoring.terms_for_score = 15
-        self._config.scoring.max_word_repeats = 1
-        self._config.scoring.new_word_score = 0.4
-        self._config.scoring.extend_top_terms = False
-        self._config.scoring.scoring_mode = "original"
-
-    def _apply_conservative_preset(self) -> None:
+        config.tokenizer.max_phrase_terms = 1
+        config.tokenizer.remove_html = False
+        config.tokenizer.min_term_length = 1
+        config.tokenizer.max_term_length = 90
+        config.tokenizer.header_mode = "all"
+
+        config.scoring.terms_for_score = 15
+        config.scoring.max_word_repeats = 1
+        config.scoring.new_word_score = 0.4
+        config.scoring.extend_top_terms = False
+        config.scoring.scoring_mode = "original"
+
+    def _apply_conservative_preset(self, config: MailProbeConfig) -> None:
         """Apply conservative settings (fewer false positives)."""
-        self._config.scoring.spam_threshold = 0.95
-        self._config.scoring.min_word_count = 10
-        self._config.scoring.new_word_score = 0.3
-        self._config.scoring.min_distance_for_score = 0.2
+        config.scoring.spam_threshold = 0.95
+        config.scoring.min_word_count = 10
+        config.scoring.new_word_score = 0.3
+        config.scoring.min_distance_for_score = 0.2
 
-    def _apply_aggressive_preset(self) -> None:
+    def _apply_aggressive_preset(self, config: MailProbeConfig) -> None:
         """Apply aggressive settings (catch more spam)."""
-        self._config.scoring.spam_threshold = 0.8
-        self._config.scoring.min_word_count = 3
-        self._config.scoring.new_word_score = 0.6
-        self._config.scoring.extend_top_terms = True
+        config.scoring.spam_threshold = 0.8
+        config.scoring.min_word_count = 3
+        config.scoring.new_word_score = 0.6
+        config.scoring.extend_top_terms = True
 
-    def _apply_fast_preset(self) -> None:
+    def _apply_fast_preset(self, config: MailProbeConfig) -> None:
         """Apply settings optimized for speed."""
-        self._config.tokenizer.max_phrase_terms = 1
-        self._config.tokenizer.ignore_body = False
-        self._config.scoring.terms_for_score = 10
-        self._config.database.cache_size = 5000
+        config.tokenizer.max_phrase_terms = 1
+        config.tokenizer.ignore_body = False
+        config.scoring.terms_for_score = 10
+        config.database.cache_size = 5000
 
 
 def get_default_config_path() -> Path:
@@ -5,20 +5,56 @@ This module provides database functionality for storing and retrieving
 word frequencies used in Bayesian spam analysis.
 """
 
+import itertools
 import sqlite3
 import threading
 import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .tokenizer import Token
 from .utils import normalize_path
 
+# Maximum number of terms bound into a single IN (...) lookup query
+_MAX_QUERY_TERMS = 500
+
+# Number of rows sent to SQLite per executemany call when importing
+_IMPORT_BATCH_SIZE = 1000
+
+# Per-connection settings; WAL journaling is persistent and set at creation.
+# These run before any table is read, so reads of up to 1 GiB of the file go
+# through the memory map, and the page cache is sized in KiB (negative value)
+# to stay the same whatever the database page size.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=1073741824",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Prepared statements kept by the shared connection; sqlite3's default is 128
+_STATEMENT_CACHE_SIZE = 256
+
+# Statements issued on hot paths; the same text lets sqlite3 reuse the plan
+_SQL_GET_WORD = "SELECT good_count, spam_count, last_update FROM words WHERE term = ?"
+_SQL_UPDATE_WORD = """
+    INSERT INTO words (term, good_count, spam_count, last_update)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(term) DO UPDATE SET
+        good_count = max(0, good_count + ?),
+        spam_count = max(0, spam_count + ?),
+        last_update = ?
+"""
+_SQL_GET_MESSAGE = "SELECT is_spam FROM messages WHERE digest = ?"
+
 
 class WordData:
     """Represents word frequency data for a single term."""
 
+    # Instances are held in the word cache and created per lookup
+    __slots__ = ("term", "good_count", "spam_count", "last_update")
+
     def __init__(
         self,
         term: str,
@@ -115,7 +151,11 @@ class WordDatabase:
         self.cache_size = cache_size
         self._cache: Dict[str, WordData] = {}
         self._cache_lock = threading.RLock()
+        self._message_counts: Optional[Tuple[int, int]] = None
+        self._word_count: Optional[int] = None
+        self._data_version: Optional[int] = None
         self._db_lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
 
         # Ensure database directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -126,6 +166,11 @@ class WordDatabase:
     def _init_database(self) -> None:
         """Initialize database tables if they don't exist."""
         with self._get_connection() as conn:
+            # Only takes effect while a new database file is still empty
+            conn.execute("PRAGMA page_size=8192")
+            # WAL is stored in the database file, so later connections keep it
+            conn.execute("PRAGMA journal_mode=WAL")
+
             # Word frequency table
             conn.execute(
                 """
@@ -160,8 +205,12 @@ class WordDatabase:
             )
 
             # Create indexes for performance
+            # Matches the total-count predicate used by cleanup and purge. It
+            # replaces a per-column index that no query could use.
+            conn.execute("DROP INDEX IF EXISTS idx_words_counts")
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_words_counts ON words(good_count, spam_count)"
+                "CREATE INDEX IF NOT EXISTS idx_words_count_age "
+                "ON words((good_count + spam_count), last_update)"
             )
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_words_update ON words(last_update)"
@@ -172,18 +221,107 @@ class WordDatabase:
 
             conn.commit()
 
+            self._init_message_totals(conn)
+
+    def _init_message_totals(self, conn: sqlite3.Connection) -> None:
+        """
+        Create the persisted good/spam message totals if they are missing.
+
+        Triggers keep one row per class in step with the messages table, so
+        opening a database does not have to count every stored digest. The
+        BEFORE INSERT trigger takes back the count of a row that INSERT OR
+        REPLACE is about to overwrite; REPLACE deletions do not fire the
+        DELETE trigger while recursive triggers are off.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+            "AND name = 'message_totals'"
+        ).fetchone()
+        if exists:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS message_totals (
+                    is_spam INTEGER PRIMARY KEY,
+                    count INTEGER NOT NULL
+                )
+            """
+            )
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO message_totals (is_spam, count)
+                SELECT 0, COUNT(*) FROM messages WHERE is_spam = 0
+                UNION ALL
+                SELECT 1, COUNT(*) FROM messages WHERE is_spam = 1
+            """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS message_totals_replace
+                BEFORE INSERT ON messages
+                BEGIN
+                    UPDATE message_totals SET count = count - 1
+                    WHERE is_spam = (
+                        SELECT is_spam FROM messages WHERE digest = NEW.digest
+                    );
+                END
+            """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS message_totals_insert
+                AFTER INSERT ON messages
+                BEGIN
+                    UPDATE message_totals SET count = count + 1
+                    WHERE is_spam = NEW.is_spam;
+                END
+            """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS message_totals_delete
+                AFTER DELETE ON messages
+                BEGIN
+                    UPDATE message_totals SET count = count - 1
+                    WHERE is_spam = OLD.is_spam;
+                END
+            """
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
     @contextmanager
     def _get_connection(self):
-        """Get a database connection with proper locking."""
+        """
+        Get the shared database connection with proper locking.
+
+        The connection is opened on first use and kept until close(), so
+        its prepared statement cache survives between calls.
+        """
         with self._db_lock:
-            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA cache_size=10000")
+            conn = self._conn
+            if conn is None:
+                conn = sqlite3.connect(
+                    str(self.db_path),
+                    timeout=30.0,
+                    check_same_thread=False,
+                    cached_statements=_STATEMENT_CACHE_SIZE,
+                )
+                for pragma in _CONNECTION_PRAGMAS:
+                    conn.execute(pragma)
+                self._conn = conn
             try:
                 yield conn
-            finally:
-                conn.close()
+            except BaseException:
+                # Never leave a half-done transaction on the shared connection
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
 
     def get_word_data(self, term: str) -> Optional[WordData]:
         """
@@ -202,10 +340,7 @@ class WordDatabase:
 
         # Query database
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT good_count, spam_count, last_update FROM words WHERE term = ?",
-                (term,),
-            )
+            cursor = conn.execute(_SQL_GET_WORD, (term,))
             row = cursor.fetchone()
 
             if row:
@@ -223,6 +358,61 @@ class WordDatabase:
 
         return None
 
+    def get_words_data(self, terms: Iterable[str]) -> Dict[str, WordData]:
+        """
+        Get word frequency data for many terms at once.
+
+        Terms missing from the cache are fetched with a single connection
+        using batched ``IN`` queries instead of one query per term.
+
+        Args:
+            terms: The words/phrases to look up
+
+        Returns:
+            Dictionary mapping found terms to their WordData
+        """
+        found: Dict[str, WordData] = {}
+        missing: List[str] = []
+
+        # Check cache first
+        with self._cache_lock:
+            for term in dict.fromkeys(terms):
+                word_data = self._cache.get(term)
+                if word_data is not None:
+                    found[term] = word_data
+                else:
+                    missing.append(term)
+
+        if not missing:
+            return found
+
+        # Query database in batches below SQLite's host parameter limit
+        with self._get_connection() as conn:
+            for start in range(0, len(missing), _MAX_QUERY_TERMS):
+                batch = missing[start : start + _MAX_QUERY_TERMS]
+                placeholders = ",".join("?" * len(batch))
+                cursor = conn.execute(
+                    "SELECT term, good_count, spam_count, last_update FROM words "
+                    f"WHERE term IN ({placeholders})",
+                    batch,
+                )
+                for row in cursor:
+                    found[row[0]] = WordData(row[0], row[1], row[2], row[3])
+
+        # Add fetched words to cache
+        with self._cache_lock:
+            for term in missing:
+                word_data = found.get(term)
+                if word_data is None:
+                    continue
+                if len(self._cache) >= self.cache_size:
+                    # Remove oldest entry (simple LRU)
+                    oldest_term = next(iter(self._cache))
+                    del self._cache[oldest_term]
+                self._cache[term] = word_data
+
+        return found
+
     def update_word_counts(self, updates: Dict[str, Tuple[int, int]]) -> None:
         """
         Update word counts for multiple terms atomically.
@@ -243,16 +433,9 @@ class WordDatabase:
                         self._cache[term].update_counts(good_delta, spam_delta)
 
             # Batch update database
-            for term, (good_delta, spam_delta) in updates.items():
-                conn.execute(
-                    """
-                    INSERT INTO words (term, good_count, spam_count, last_update)
-                    VALUES (?, ?, ?, ?)
-                    ON CONFLICT(term) DO UPDATE SET
-                        good_count = max(0, good_count + ?),
-                        spam_count = max(0, spam_count + ?),
-                        last_update = ?
-                """,
+            conn.executemany(
+                _SQL_UPDATE_WORD,
+                [
                     (
                         term,
                         max(0, good_delta),
@@ -261,10 +444,14 @@ class WordDatabase:
                         good_delta,
                         spam_delta,
                         current_time,
-                    ),
-                )
+                    )
+                    for term, (good_delta, spam_delta) in updates.items()
+                ],
+            )
 
             conn.commit()
+            # New terms may have been inserted, so recount on next request
+            self._word_count = None
 
     def add_message(self, digest: str, is_spam: bool) -> None:
         """
@@ -283,6 +470,30 @@ class WordDatabase:
                 (digest, int(is_spam), int(time.time())),
             )
             conn.commit()
+            self._message_counts = None
+
+    def add_messages(self, messages: Iterable[Tuple[str, bool]]) -> None:
+        """
+        Add several message digests in a single transaction.
+
+        Args:
+            messages: Iterable of (digest, is_spam) pairs
+        """
+        timestamp = int(time.time())
+        rows = [(digest, int(is_spam), timestamp) for digest, is_spam in messages]
+        if not rows:
+            return
+
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO messages (digest, is_spam, timestamp)
+                VALUES (?, ?, ?)
+            """,
+                rows,
+            )
+            conn.commit()
+            self._message_counts = None
 
     def contains_message(self, digest: str) -> Tuple[bool, Optional[bool]]:
         """
@@ -295,45 +506,108 @@ class WordDatabase:
             Tuple of (exists, is_spam_if_exists)
         """
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT is_spam FROM messages WHERE digest = ?", (digest,)
-            )
+            cursor = conn.execute(_SQL_GET_MESSAGE, (digest,))
             row = cursor.fetchone()
 
             if row:
                 return True, bool(row[0])
             return False, None
 
+    def get_message_classifications(self, digests: Iterable[str]) -> Dict[str, bool]:
+        """
+        Look up several processed messages at once.
+
+        Args:
+            digests: Message digests to check
+
+        Returns:
+            Dictionary mapping digests of known messages to is_spam
+        """
+        unique = list(dict.fromkeys(digests))
+        found: Dict[str, bool] = {}
+        if not unique:
+            return found
+
+        with self._get_connection() as conn:
+            for start in range(0, len(unique), _MAX_QUERY_TERMS):
+                batch = unique[start : start + _MAX_QUERY_TERMS]
+                placeholders = ",".join("?" * len(batch))
+                cursor = conn.execute(
+                    "SELECT digest, is_spam FROM messages "
+                    f"WHERE digest IN ({placeholders})",
+                    batch,
+                )
+                for row in cursor:
+                    found[row[0]] = bool(row[1])
+
+        return found
+
     def remove_message(self, digest: str) -> None:
         """Remove a message digest from the database."""
         with self._get_connection() as conn:
             conn.execute("DELETE FROM messages WHERE digest = ?", (digest,))
             conn.commit()
+            self._message_counts = None
+
+    def _check_data_version(self, conn: sqlite3.Connection) -> None:
+        """
+        Drop the cached totals if another connection changed the database.
+
+        SQLite bumps ``data_version`` for commits made by any other
+        connection, including other processes, but not for this one's own
+        commits, which reset the totals where they are made.
+        """
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._message_counts = None
+            self._word_count = None
 
     def get_message_counts(self) -> Tuple[int, int]:
         """
         Get total message counts.
 
+        The totals are maintained by triggers in the message_totals table
+        and cached here until the database changes, so no call scans the
+        messages.
+
         Returns:
             Tuple of (good_message_count, spam_message_count)
         """
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT 
-                    SUM(CASE WHEN is_spam = 0 THEN 1 ELSE 0 END) as good_count,
-                    SUM(CASE WHEN is_spam = 1 THEN 1 ELSE 0 END) as spam_count
-                FROM messages
-            """
-            )
-            row = cursor.fetchone()
-            return (row[0] or 0, row[1] or 0)
+            self._check_data_version(conn)
+            counts = self._message_counts
+            if counts is None:
+                totals = dict(conn.execute("SELECT is_spam, count FROM message_totals"))
+                counts = (totals.get(0, 0), totals.get(1, 0))
+                self._message_counts = counts
+
+        return counts
 
     def get_word_count(self) -> int:
-        """Get total number of unique words in database."""
+        """
+        Get total number of unique words in database.
+
+        The count is kept between calls and adjusted when words are
+        deleted, so the full table scan only runs again after training,
+        importing or another connection has changed the database.
+
+        Returns:
+            Number of words stored
+        """
         with self._get_connection() as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM words")
-            return cursor.fetchone()[0]
+            self._check_data_version(conn)
+            word_count = self._word_count
+            if word_count is None:
+                word_count = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+                self._word_count = word_count
+
+        return word_count
+
+    def _adjust_word_count(self, delta: int) -> None:
+        """Apply a known change to the maintained word count."""
+        if self._word_count is not None:
+            self._word_count += delta
 
     def cleanup_old_words(self, max_count: int = 2, max_age_days: int = 7) -> int:
         """
@@ -360,6 +634,7 @@ class WordDatabase:
 
             removed_count = cursor.rowcount
             conn.commit()
+            self._adjust_word_count(-removed_count)
 
             # Clear cache to ensure consistency
             with self._cache_lock:
@@ -388,6 +663,7 @@ class WordDatabase:
 
             removed_count = cursor.rowcount
             conn.commit()
+            self._adjust_word_count(-removed_count)
 
             # Clear cache to ensure consistency
             with self._cache_lock:
@@ -406,8 +682,7 @@ class WordDatabase:
             cursor = conn.execute(
                 "SELECT term, good_count, spam_count FROM words ORDER BY term"
             )
-            for row in cursor:
-                yield (row[0], row[1], row[2])
+            yield from cursor
 
     def import_words(self, word_data: Iterator[Tuple[str, int, int]]) -> int:
         """
@@ -421,23 +696,28 @@ class WordDatabase:
         """
         count = 0
         current_time = int(time.time())
+        rows = (
+            (term, good_count, spam_count, current_time)
+            for term, good_count, spam_count in word_data
+        )
 
         with self._get_connection() as conn:
-            for term, good_count, spam_count in word_data:
-                conn.execute(
+            # Insert in bounded chunks within a single transaction
+            while True:
+                chunk = list(itertools.islice(rows, _IMPORT_BATCH_SIZE))
+                if not chunk:
+                    break
+                conn.executemany(
                     """
                     INSERT OR REPLACE INTO words (term, good_count, spam_count, last_update)
                     VALUES (?, ?, ?, ?)
                 """,
-                    (term, good_count, spam_count, current_time),
+                    chunk,
                 )
-                count += 1
-
-                # Commit in batches for better performance
-                if count % 1000 == 0:
-                    conn.commit()
+                count += len(chunk)
 
             conn.commit()
+            self._word_count = None
 
         # Clear cache to ensure consistency
         with self._cache_lock:
@@ -450,33 +730,50 @@ class WordDatabase:
         with self._get_connection() as conn:
             conn.execute("VACUUM")
 
+    def get_counts(self) -> Tuple[int, int, int]:
+        """
+        Get the word and message totals.
+
+        Both come from counts kept in memory until the database changes,
+        so this is cheap enough for callers that only need the totals.
+
+        Returns:
+            Tuple of (word_count, good_message_count, spam_message_count)
+        """
+        good_count, spam_count = self.get_message_counts()
+        return self.get_word_count(), good_count, spam_count
+
     def get_database_info(self) -> Dict[str, Any]:
-        """Get information about the database."""
-        with self._get_connection() as conn:
-            # Get word count
-            cursor = conn.execute("SELECT COUNT(*) FROM words")
-            word_count = cursor.fetchone()[0]
-
-            # Get message counts
-            good_count, spam_count = self.get_message_counts()
-
-            # Get database file size
-            file_size = self.db_path.stat().st_size if self.db_path.exists() else 0
-
-            return {
-                "word_count": word_count,
-                "good_message_count": good_count,
-                "spam_message_count": spam_count,
-                "total_message_count": good_count + spam_count,
-                "database_file_size": file_size,
-                "cache_size": len(self._cache),
-                "database_path": str(self.db_path),
-            }
+        """Get information about the database, including its file size."""
+        word_count, good_count, spam_count = self.get_counts()
+
+        # Get database file size
+        try:
+            file_size = self.db_path.stat().st_size
+        except FileNotFoundError:
+            file_size = 0
+
+        return {
+            "word_count": word_count,
+            "good_message_count": good_count,
+            "spam_message_count": spam_count,
+            "total_message_count": good_count + spam_count,
+            "database_file_size": file_size,
+            "cache_size": len(self._cache),
+            "database_path": str(self.db_path),
+        }
 
     def close(self) -> None:
-        """Close the database and clear cache."""
+        """Close the database connection and clear cache."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
         with self._cache_lock:
             self._cache.clear()
+        self._message_counts = None
+        self._word_count = None
+        self._data_version = None
 
     def __enter__(self):
         return self
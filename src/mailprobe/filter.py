@@ -5,10 +5,12 @@ This module provides the core MailFilter class that combines tokenization,
 database operations, and Bayesian scoring to classify email messages.
 """
 
+import heapq
 import math
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 from .database import WordData, WordDatabase
 from .message import EmailMessage
@@ -40,6 +42,18 @@ class FilterConfig:
     # Database parameters
     cache_size: int = 2500
 
+    def create_tokenizer(self) -> EmailTokenizer:
+        """Create a tokenizer using the tokenizer parameters of this config."""
+        return EmailTokenizer(
+            max_phrase_terms=self.max_phrase_terms,
+            min_phrase_terms=self.min_phrase_terms,
+            min_term_length=self.min_term_length,
+            max_term_length=self.max_term_length,
+            remove_html=self.remove_html,
+            ignore_body=self.ignore_body,
+            replace_non_ascii=self.replace_non_ascii,
+        )
+
 
 class MailScore(NamedTuple):
     """Represents the result of scoring a message."""
@@ -78,15 +92,52 @@ class MailFilter:
         self.database = WordDatabase(db_file, self.config.cache_size)
 
         # Initialize tokenizer
-        self.tokenizer = EmailTokenizer(
-            max_phrase_terms=self.config.max_phrase_terms,
-            min_phrase_terms=self.config.min_phrase_terms,
-            min_term_length=self.config.min_term_length,
-            max_term_length=self.config.max_term_length,
-            remove_html=self.config.remove_html,
-            ignore_body=self.config.ignore_body,
-            replace_non_ascii=self.config.replace_non_ascii,
-        )
+        self.tokenizer = self.config.create_tokenizer()
+
+        # Precomputed term probabilities while the filter is frozen
+        self._frozen_probabilities: Optional[Dict[str, float]] = None
+
+    @property
+    def is_frozen(self) -> bool:
+        """Whether scoring uses a frozen probability table."""
+        return self._frozen_probabilities is not None
+
+    def freeze(self) -> None:
+        """
+        Precompute term probabilities for repeated scoring.
+
+        Word probabilities only change when the database is trained, so
+        for a read-only workload they can be evaluated once for the whole
+        vocabulary. While frozen, scoring is a dictionary lookup per token
+        with no database access. Any change to the database through this
+        filter unfreezes it again.
+        """
+        good_count, spam_count = self.database.get_message_counts()
+        min_word_count = self.config.min_word_count
+        new_word_score = self.config.new_word_score
+
+        # Most terms share a handful of (good, spam) count pairs, so each
+        # distinct pair is evaluated once and its float object is shared
+        by_counts: Dict[Tuple[int, int], float] = {}
+        probabilities: Dict[str, float] = {}
+
+        for term, good, spam in self.database.export_words():
+            probability = by_counts.get((good, spam))
+            if probability is None:
+                probability = WordData(term, good, spam).calculate_probability(
+                    good_count, spam_count, min_word_count, new_word_score
+                )
+                by_counts[(good, spam)] = probability
+
+            # Terms at the default score need no entry
+            if probability != new_word_score:
+                probabilities[term] = probability
+
+        self._frozen_probabilities = probabilities
+
+    def unfreeze(self) -> None:
+        """Return to scoring against the live database."""
+        self._frozen_probabilities = None
 
     def score_message(self, message: EmailMessage) -> MailScore:
         """
@@ -98,30 +149,95 @@ class MailFilter:
         Returns:
             MailScore with probability and analysis details
         """
-        # Tokenize the message
-        tokens = self.tokenizer.tokenize_message(message)
+        return self.score_messages([message])[0]
 
-        # Get word data from database and calculate probabilities
-        scored_tokens = []
-        good_count, spam_count = self.database.get_message_counts()
+    def score_tokens(self, tokens: List[Token]) -> MailScore:
+        """
+        Score an already tokenized message.
+
+        This lets callers that tokenize a message once reuse the tokens
+        across several filters built from the same configuration.
+
+        Args:
+            tokens: Tokens produced by this filter's tokenizer configuration
+
+        Returns:
+            MailScore with probability and analysis details
+        """
+        probabilities = self._term_probabilities(token.get_key() for token in tokens)
+        return self._score_tokens(tokens, probabilities)
+
+    def score_messages(self, messages: List[EmailMessage]) -> List[MailScore]:
+        """
+        Score several messages in one pass over the database.
 
+        All messages are tokenized first and the word data for every
+        distinct term is fetched with a single bulk lookup, so the cost
+        of database access is shared across the whole batch.
+
+        Args:
+            messages: EmailMessages to score
+
+        Returns:
+            List of MailScore results in the same order as ``messages``
+        """
+        # Tokenize all messages up front
+        token_lists = [m.get_tokens(self.tokenizer) for m in messages]
+
+        # Look up every distinct term in one pass
+        probabilities = self._term_probabilities(
+            token.get_key() for tokens in token_lists for token in tokens
+        )
+
+        return [self._score_tokens(tokens, probabilities) for tokens in token_lists]
+
+    def _term_probabilities(self, terms: Iterable[str]) -> Dict[str, float]:
+        """
+        Get spam probabilities for terms found in the database.
+
+        Terms missing from the result score as ``new_word_score``.
+        """
+        if self._frozen_probabilities is not None:
+            return self._frozen_probabilities
+
+        # Fetch word data for every distinct term in one lookup
+        word_data = self.database.get_words_data(terms)
+        good_count, spam_count = self.database.get_message_counts()
+        min_word_count = self.config.min_word_count
+        new_word_score = self.config.new_word_score
+
+        return {
+            term: data.calculate_probability(
+                good_count, spam_count, min_word_count, new_word_score
+            )
+            for term, data in word_data.items()
+        }
+
+    def _score_tokens(
+        self, tokens: List[Token], probabilities: Dict[str, float]
+    ) -> MailScore:
+        """Score a tokenized message against precomputed term probabilities."""
+        new_word_score = self.config.new_word_score
+
+        # Collapse repeated terms onto one scoring token per distinct term, so
+        # each term is looked up only once. The message's tokens may be
+        # shared (see EmailMessage.get_tokens), so they are copied rather
+        # than given the per-call count and probability.
+        unique_tokens: Dict[str, Token] = {}
         for token in tokens:
-            word_data = self.database.get_word_data(token.get_key())
-            if word_data:
-                probability = word_data.calculate_probability(
-                    good_count,
-                    spam_count,
-                    self.config.min_word_count,
-                    self.config.new_word_score,
-                )
+            key = token.get_key()
+            scored = unique_tokens.get(key)
+            if scored is None:
+                scored = Token(token.text, token.flags, token.prefix)
+                scored.probability = probabilities.get(key, new_word_score)
+                unique_tokens[key] = scored
             else:
-                probability = self.config.new_word_score
-
-            token.probability = probability
-            scored_tokens.append(token)
+                scored.count += 1
 
         # Select most significant tokens for scoring
-        significant_tokens = self._select_significant_tokens(scored_tokens)
+        significant_tokens = self._select_significant_tokens(
+            list(unique_tokens.values())
+        )
 
         # Calculate final probability using Bayesian combination
         final_probability = self._calculate_bayesian_probability(significant_tokens)
@@ -147,7 +263,11 @@ class MailFilter:
         )
 
     def train_message(
-        self, message: EmailMessage, is_spam: bool, force_update: bool = False
+        self,
+        message: EmailMessage,
+        is_spam: bool,
+        force_update: bool = False,
+        tokens: Optional[List[Token]] = None,
     ) -> bool:
         """
         Train the filter on a message.
@@ -156,6 +276,7 @@ class MailFilter:
             message: EmailMessage to train on
             is_spam: Whether the message is spam
             force_update: Force update even if message was seen before
+            tokens: Pre-tokenized message content (tokenized here if None)
 
         Returns:
             True if database was updated, False otherwise
@@ -170,11 +291,103 @@ class MailFilter:
             elif previous_classification is not None:
                 # Reclassification needed
                 return self._reclassify_message(
-                    message, is_spam, previous_classification
+                    message, is_spam, previous_classification, tokens
                 )
 
         # New message or forced update
-        return self._add_message_to_database(message, is_spam)
+        return self._add_message_to_database(message, is_spam, tokens)
+
+    def train_messages(
+        self,
+        messages: List[EmailMessage],
+        is_spam: bool,
+        force_update: bool = False,
+        token_lists: Optional[List[List[Token]]] = None,
+    ) -> int:
+        """
+        Train the filter on several messages with the same classification.
+
+        This gives the same result as calling ``train_message`` for each
+        message in turn, but the word count changes of the whole batch are
+        aggregated and written in one update.
+
+        Args:
+            messages: EmailMessages to train on
+            is_spam: Whether the messages are spam
+            force_update: Force update even if a message was seen before
+            token_lists: Pre-tokenized content for each message (optional)
+
+        Returns:
+            Number of messages that updated the database
+        """
+        if token_lists is None:
+            token_lists = [m.get_tokens(self.tokenizer) for m in messages]
+
+        return self.train_tokenized(
+            [message.digest for message in messages], token_lists, is_spam, force_update
+        )
+
+    def train_tokenized(
+        self,
+        digests: List[str],
+        token_lists: List[List[Token]],
+        is_spam: bool,
+        force_update: bool = False,
+    ) -> int:
+        """
+        Train the filter on already tokenized messages.
+
+        Args:
+            digests: Message digest of each message
+            token_lists: Tokens of each message, in the same order
+            is_spam: Whether the messages are spam
+            force_update: Force update even if a message was seen before
+
+        Returns:
+            Number of messages that updated the database
+        """
+        self.unfreeze()
+
+        known = self.database.get_message_classifications(digests)
+        good_deltas: Counter = Counter()
+        spam_deltas: Counter = Counter()
+        trained: Dict[str, bool] = {}
+        updated = 0
+
+        for digest, tokens in zip(digests, token_lists):
+            previous_classification = trained.get(digest, known.get(digest))
+
+            if previous_classification is not None and not force_update:
+                if previous_classification == is_spam:
+                    # Same classification, no update needed
+                    continue
+
+            token_counts = self._count_terms(tokens)
+
+            if previous_classification is not None and not force_update:
+                # Reclassification: remove the old counts first
+                if previous_classification:
+                    spam_deltas.subtract(token_counts)
+                else:
+                    good_deltas.subtract(token_counts)
+
+            if is_spam:
+                spam_deltas.update(token_counts)
+            else:
+                good_deltas.update(token_counts)
+
+            trained[digest] = is_spam
+            updated += 1
+
+        if trained:
+            updates = {
+                term: (good_deltas.get(term, 0), spam_deltas.get(term, 0))
+                for term in good_deltas.keys() | spam_deltas.keys()
+            }
+            self.database.update_word_counts(updates)
+            self.database.add_messages((digest, is_spam) for digest in trained)
+
+        return updated
 
     def train_message_selective(self, message: EmailMessage, is_spam: bool) -> bool:
         """
@@ -236,22 +449,14 @@ class MailFilter:
         if not exists:
             return False
 
-        # Tokenize message to get terms to decrement
-        tokens = self.tokenizer.tokenize_message(message)
+        self.unfreeze()
 
-        # Count token frequencies
-        token_counts: Dict[str, int] = {}
-        for token in tokens:
-            key = token.get_key()
-            token_counts[key] = token_counts.get(key, 0) + 1
+        # Tokenize message to get terms to decrement
+        tokens = message.get_tokens(self.tokenizer)
 
         # Prepare updates (negative counts to decrement)
-        updates = {}
-        for term, count in token_counts.items():
-            if was_spam:
-                updates[term] = (0, -count)  # Decrement spam count
-            else:
-                updates[term] = (-count, 0)  # Decrement good count
+        good_sign, spam_sign = (0, -1) if was_spam else (-1, 0)
+        updates = self._term_updates(self._count_terms(tokens), good_sign, spam_sign)
 
         # Apply updates
         self.database.update_word_counts(updates)
@@ -270,6 +475,7 @@ class MailFilter:
         Returns:
             Number of words removed
         """
+        self.unfreeze()
         return self.database.cleanup_old_words(max_count, max_age_days)
 
     def purge_database(self, max_count: int = 2) -> int:
@@ -282,8 +488,13 @@ class MailFilter:
         Returns:
             Number of words removed
         """
+        self.unfreeze()
         return self.database.purge_words(max_count)
 
+    def get_counts(self) -> Tuple[int, int, int]:
+        """Get (word_count, good_message_count, spam_message_count) totals."""
+        return self.database.get_counts()
+
     def get_database_info(self) -> Dict[str, Any]:
         """Get information about the database."""
         return self.database.get_database_info()
@@ -294,6 +505,7 @@ class MailFilter:
 
     def import_database(self, word_data: List[Tuple[str, int, int]]) -> int:
         """Import words into the database."""
+        self.unfreeze()
         return self.database.import_words(iter(word_data))
 
     def _select_significant_tokens(self, tokens: List[Token]) -> List[Token]:
@@ -301,31 +513,30 @@ class MailFilter:
         Select the most significant tokens for scoring.
 
         This implements the token selection algorithm from original MailProbe.
+        Tokens must be distinct terms whose ``count`` holds their frequency.
         """
-        # Count token frequencies
-        token_freq = {}
-        for token in tokens:
-            key = token.get_key()
-            if key not in token_freq:
-                token_freq[key] = token
-                token_freq[key].count = 1
-            else:
-                token_freq[key].count += 1
-
-        # Convert to list and filter by significance
-        unique_tokens = list(token_freq.values())
+        config = self.config
+        terms_for_score = config.terms_for_score
+        max_word_repeats = config.max_word_repeats
 
         # Filter tokens by distance from neutral (0.5)
-        significant_tokens = []
-        for token in unique_tokens:
-            distance = abs(token.probability - 0.5)
-            if distance >= self.config.min_distance_for_score:
-                significant_tokens.append(token)
-
-        # Sort by significance (distance from 0.5, then by frequency)
-        significant_tokens.sort(
-            key=lambda t: (abs(t.probability - 0.5), t.count), reverse=True
-        )
+        min_distance = config.min_distance_for_score
+        significant_tokens = [
+            token for token in tokens if abs(token.probability - 0.5) >= min_distance
+        ]
+
+        # Order by significance (distance from 0.5, then by frequency). Only
+        # the top terms_for_score are needed unless the list may be extended,
+        # and nlargest returns exactly the head of the full stable sort.
+        def significance(token: Token) -> Tuple[float, int]:
+            return (abs(token.probability - 0.5), token.count)
+
+        if config.extend_top_terms:
+            significant_tokens.sort(key=significance, reverse=True)
+        else:
+            significant_tokens = heapq.nlargest(
+                terms_for_score, significant_tokens, key=significance
+            )
 
         # Select top tokens
         selected_tokens = []
@@ -333,24 +544,23 @@ class MailFilter:
 
         for token in significant_tokens:
             # Limit repeats of same term
-            current_count = term_counts.get(token.get_key(), 0)
-            if current_count < self.config.max_word_repeats:
+            key = token.get_key()
+            current_count = term_counts.get(key, 0)
+            if current_count < max_word_repeats:
                 selected_tokens.append(token)
-                term_counts[token.get_key()] = current_count + 1
+                term_counts[key] = current_count + 1
 
                 # Stop when we have enough terms
-                if len(selected_tokens) >= self.config.terms_for_score:
+                if len(selected_tokens) >= terms_for_score:
                     break
 
         # Extend with additional significant terms if configured
-        if self.config.extend_top_terms and len(selected_tokens) < len(
-            significant_tokens
-        ):
+        if config.extend_top_terms and len(selected_tokens) < len(significant_tokens):
 
             for token in significant_tokens[len(selected_tokens) :]:
                 if token.probability <= 0.1 or token.probability >= 0.9:
                     selected_tokens.append(token)
-                    if len(selected_tokens) >= self.config.terms_for_score * 2:
+                    if len(selected_tokens) >= terms_for_score * 2:
                         break
 
         return selected_tokens
@@ -360,56 +570,64 @@ class MailFilter:
         Calculate final spam probability using Bayesian combination.
 
         This implements the probability combination algorithm from Paul Graham's
-        "A Plan for Spam" with improvements from MailProbe.
+        "A Plan for Spam" with improvements from MailProbe. The products are
+        accumulated as sums of logarithms, so long token lists cannot underflow.
         """
         if not tokens:
             return self.config.new_word_score
 
-        # Calculate product of probabilities and inverse probabilities
-        spam_product = 1.0
-        good_product = 1.0
+        # Sum log probabilities and log inverse probabilities
+        log_spam = 0.0
+        log_good = 0.0
 
         for token in tokens:
             # Use token frequency as weight
             weight = min(token.count, 5)  # Cap weight to avoid dominance
 
-            for _ in range(weight):
-                spam_product *= token.probability
-                good_product *= 1.0 - token.probability
+            log_spam += weight * math.log(max(token.probability, 1e-200))
+            log_good += weight * math.log(max(1.0 - token.probability, 1e-200))
 
-                # Prevent underflow
-                if spam_product < 1e-200:
-                    spam_product = 1e-200
-                if good_product < 1e-200:
-                    good_product = 1e-200
-
-        # Combine using Bayesian formula
+        # Combine using Bayesian formula: spam / (spam + good)
         try:
-            probability = spam_product / (spam_product + good_product)
-        except (ZeroDivisionError, OverflowError):
-            probability = self.config.new_word_score
+            probability = 1.0 / (1.0 + math.exp(log_good - log_spam))
+        except OverflowError:
+            probability = 0.0
 
         # Ensure reasonable bounds
         return max(0.0001, min(0.9999, probability))
 
-    def _add_message_to_database(self, message: EmailMessage, is_spam: bool) -> bool:
+    @staticmethod
+    def _count_terms(tokens: List[Token]) -> Dict[str, int]:
+        """Count occurrences of each database key in a token list."""
+        # Counter tallies the keys in C rather than a Python-level loop
+        return Counter([token.get_key() for token in tokens])
+
+    @staticmethod
+    def _term_updates(
+        token_counts: Dict[str, int], good_sign: int, spam_sign: int
+    ) -> Dict[str, Tuple[int, int]]:
+        """Scale term counts into (good_delta, spam_delta) database updates."""
+        return {
+            term: (count * good_sign, count * spam_sign)
+            for term, count in token_counts.items()
+        }
+
+    def _add_message_to_database(
+        self,
+        message: EmailMessage,
+        is_spam: bool,
+        tokens: Optional[List[Token]] = None,
+    ) -> bool:
         """Add a new message to the database."""
-        # Tokenize message
-        tokens = self.tokenizer.tokenize_message(message)
+        self.unfreeze()
 
-        # Count token frequencies
-        token_counts: Dict[str, int] = {}
-        for token in tokens:
-            key = token.get_key()
-            token_counts[key] = token_counts.get(key, 0) + 1
+        # Tokenize message
+        if tokens is None:
+            tokens = message.get_tokens(self.tokenizer)
 
         # Prepare updates
-        updates = {}
-        for term, count in token_counts.items():
-            if is_spam:
-                updates[term] = (0, count)  # Increment spam count
-            else:
-                updates[term] = (count, 0)  # Increment good count
+        good_sign, spam_sign = (0, 1) if is_spam else (1, 0)
+        updates = self._term_updates(self._count_terms(tokens), good_sign, spam_sign)
 
         # Apply updates
         self.database.update_word_counts(updates)
@@ -418,37 +636,22 @@ class MailFilter:
         return True
 
     def _reclassify_message(
-        self, message: EmailMessage, new_classification: bool, old_classification: bool
+        self,
+        message: EmailMessage,
+        new_classification: bool,
+        old_classification: bool,
+        tokens: Optional[List[Token]] = None,
     ) -> bool:
         """Reclassify a message by updating word counts."""
-        # Tokenize message
-        tokens = self.tokenizer.tokenize_message(message)
+        self.unfreeze()
 
-        # Count token frequencies
-        token_counts: Dict[str, int] = {}
-        for token in tokens:
-            key = token.get_key()
-            token_counts[key] = token_counts.get(key, 0) + 1
+        # Tokenize message
+        if tokens is None:
+            tokens = message.get_tokens(self.tokenizer)
 
         # Prepare updates (remove old classification, add new)
-        updates = {}
-        for term, count in token_counts.items():
-            good_delta = 0
-            spam_delta = 0
-
-            # Remove old classification
-            if old_classification:  # Was spam
-                spam_delta -= count
-            else:  # Was good
-                good_delta -= count
-
-            # Add new classification
-            if new_classification:  # Now spam
-                spam_delta += count
-            else:  # Now good
-                good_delta += count
-
-            updates[term] = (good_delta, spam_delta)
+        spam_sign = int(new_classification) - int(old_classification)
+        updates = self._term_updates(self._count_terms(tokens), -spam_sign, spam_sign)
 
         # Apply updates
         self.database.update_word_counts(updates)
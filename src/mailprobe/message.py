@@ -6,16 +6,66 @@ including support for various mailbox formats and MIME decoding.
 """
 
 import email
+import email.headerregistry
 import email.policy
 import hashlib
-import mailbox
+import itertools
+import mmap
+import os
 import re
+import stat
 from email.message import EmailMessage as StdEmailMessage
 from pathlib import Path
-from typing import Dict, Iterator, List, Optional, TextIO, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 from .utils import normalize_path, safe_open_text
 
+if TYPE_CHECKING:
+    from .tokenizer import EmailTokenizer, Token
+
+# Lines read from the start of a file to decide whether it is an mbox
+_MBOX_PROBE_LINES = 51
+
+# A carriage return that does not end a CRLF pair, which text mode would
+# also treat as a line break
+_LONE_CR_RE = re.compile(rb"\r(?!\n)")
+
+# A From_ line, which starts a new message in an mbox
+_FROM_LINE_RE = re.compile(r"^From .*\n?", re.MULTILINE)
+
+# Length of EmailMessage.digest: MD5 hex digests are stored in existing
+# databases, so changing the hash would orphan every trained message
+DIGEST_HEX_LEN = 32
+
+# Headers that identify a message for duplicate detection, in digest order
+_DIGEST_HEADERS = ("from", "to", "subject", "date", "message-id")
+
+# Whitespace runs collapsed before hashing
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# MIME parts of a multipart message that contribute to the body text
+_BODY_CONTENT_TYPES = frozenset(("text/plain", "text/html"))
+
+# Line separators removed when unfolding a header, as email.policy does
+_LINESEP_RE = re.compile(r"\n|\r")
+
+# Headers the default policy parses as more than unstructured text
+_STRUCTURED_HEADERS = frozenset(
+    name
+    for name, header_class in email.policy.default.header_factory.registry.items()
+    if not issubclass(header_class, email.headerregistry.UnstructuredHeader)
+)
+
 
 class EmailMessage:
     """
@@ -50,6 +100,7 @@ class EmailMessage:
         self._digest: Optional[str] = None
         self._headers: Optional[Dict[str, str]] = None
         self._body: Optional[str] = None
+        self._tokens: Dict[Any, List["Token"]] = {}
 
     @property
     def headers(self) -> Dict[str, str]:
@@ -57,7 +108,7 @@ class EmailMessage:
         if self._headers is None:
             self._headers = {}
 
-            for key, value in self._message.items():
+            for key, value in self._header_items():
                 # Normalize header names to lowercase
                 normalized_key = key.lower()
 
@@ -69,6 +120,31 @@ class EmailMessage:
 
         return self._headers
 
+    def _header_items(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate header names and values as the message policy presents them.
+
+        With the default policy every value is parsed by the header
+        registry. Unstructured ASCII headers without encoded words (such as
+        Subject, Received and X- headers) decode to their unfolded source
+        text, so those skip the parse and give the same string.
+        """
+        message = self._message
+        fetch = message.policy.header_fetch_parse
+        default_policy = message.policy is email.policy.default
+
+        for name, value in message.raw_items():
+            if (
+                default_policy
+                and type(value) is str
+                and value.isascii()
+                and "=?" not in value
+                and name.lower() not in _STRUCTURED_HEADERS
+            ):
+                yield name, "".join(_LINESEP_RE.split(value))
+            else:
+                yield name, str(fetch(name, value))
+
     @property
     def body(self) -> str:
         """Get the email body content as plain text."""
@@ -88,14 +164,13 @@ class EmailMessage:
         body_parts = []
 
         if self._message.is_multipart():
-            # Handle multipart messages
+            # Handle multipart messages. Parsing Content-Type is the costly
+            # step, so containers are skipped and each leaf is parsed once.
             for part in self._message.walk():
-                if part.get_content_type() == "text/plain":
-                    content = part.get_content()
-                    if isinstance(content, str):
-                        body_parts.append(content)
-                elif part.get_content_type() == "text/html":
-                    # Include HTML content but it will be processed by tokenizer
+                if part.is_multipart():
+                    continue
+                # HTML is included too; the tokenizer strips the markup
+                if part.get_content_type() in _BODY_CONTENT_TYPES:
                     content = part.get_content()
                     if isinstance(content, str):
                         body_parts.append(content)
@@ -114,32 +189,56 @@ class EmailMessage:
         # This helps identify the same message even if headers change slightly
 
         # Get key headers for digest
-        key_headers = ["from", "to", "subject", "date", "message-id"]
+        headers = self.headers
         digest_content = []
 
-        for header in key_headers:
-            value = self.headers.get(header, "")
+        for header in _DIGEST_HEADERS:
+            value = headers.get(header, "")
             if value:
                 # Normalize whitespace and case
-                normalized = re.sub(r"\s+", " ", value.strip().lower())
+                normalized = _WHITESPACE_RE.sub(" ", value.strip().lower())
                 digest_content.append(f"{header}:{normalized}")
 
         # Add body content (first 1000 chars to avoid huge digests)
         body = self.body[:1000] if self.body else ""
-        body_normalized = re.sub(r"\s+", " ", body.strip().lower())
+        body_normalized = _WHITESPACE_RE.sub(" ", body.strip().lower())
         digest_content.append(f"body:{body_normalized}")
 
-        # Calculate MD5 hash
+        # Calculate MD5 hash; digests are stored in the database, so the
+        # algorithm is part of the on-disk format. It is not a security hash.
         content_str = "\n".join(digest_content)
-        return hashlib.md5(content_str.encode("utf-8")).hexdigest()
+        return hashlib.md5(
+            content_str.encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
 
     def get_header(self, name: str, default: str = "") -> str:
         """Get a specific header value."""
-        return self.headers.get(name.lower(), default)
+        headers = self.headers
+        # Names are usually passed in lowercase already
+        value = headers.get(name)
+        if value is None:
+            value = headers.get(name.lower(), default)
+        return value
 
     def has_header(self, name: str) -> bool:
         """Check if a header exists."""
-        return name.lower() in self.headers
+        headers = self.headers
+        return name in headers or name.lower() in headers
+
+    def get_tokens(self, tokenizer: "EmailTokenizer") -> List["Token"]:
+        """
+        Get the tokens for this message, tokenizing at most once per setup.
+
+        Results are kept per tokenizer configuration, so scoring and then
+        training the same message with one filter tokenizes it only once.
+        The returned list is shared and must not be modified.
+        """
+        key = tokenizer.config_key
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            tokens = tokenizer.tokenize_message(self)
+            self._tokens[key] = tokens
+        return tokens
 
     def __str__(self) -> str:
         return f"EmailMessage(digest={self.digest[:8]}..., subject={self.get_header('subject', 'No Subject')[:50]})"
@@ -182,18 +281,26 @@ class EmailMessageReader:
         """
         filepath = normalize_path(filepath)
 
-        if not filepath.exists():
-            raise FileNotFoundError(f"File not found: {filepath}")
+        # A single stat answers both "exists" and "is a directory"
+        try:
+            mode = os.stat(filepath).st_mode
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotFoundError(f"File not found: {filepath}") from None
 
-        if filepath.is_dir():
+        if stat.S_ISDIR(mode):
             # Assume Maildir format
             yield from self._read_maildir(filepath)
         else:
-            # Try to determine format by content
+            # Try to determine format by content. Only the first lines are
+            # needed for that, so a large mailbox is not read into memory
+            # before the mailbox module parses it.
+            content = None
             with safe_open_text(filepath) as f:
-                content = f.read()
+                head = "".join(itertools.islice(f, _MBOX_PROBE_LINES))
+                if not self._is_mbox_format(head):
+                    content = head + f.read()
 
-            if self._is_mbox_format(content):
+            if content is None:
                 yield from self._read_mbox_file(filepath)
             else:
                 # Treat as single message
@@ -203,6 +310,9 @@ class EmailMessageReader:
         """
         Read a single message from a string.
 
+        The text is parsed directly, without the format detection that
+        read_from_file does, so it is always a single message.
+
         Args:
             content: Raw email message content
 
@@ -224,17 +334,71 @@ class EmailMessageReader:
         return EmailMessage(content)
 
     def _read_mbox_file(self, filepath: Path) -> Iterator[EmailMessage]:
-        """Read messages from an mbox format file."""
-        try:
-            mbox = mailbox.mbox(str(filepath))
-            for message in mbox:
-                yield EmailMessage(message)  # type: ignore
-        except Exception as e:
-            # Fallback to manual parsing if mailbox module fails
-            yield from self._read_mbox_manual(filepath)
-
-    def _read_mbox_manual(self, filepath: Path) -> Iterator[EmailMessage]:
-        """Manually parse mbox format file."""
+        """
+        Read messages from an mbox format file.
+
+        A mailbox that starts with a From_ line is memory-mapped and split by
+        searching the raw bytes for the next From_ line, so only one message
+        at a time is copied and decoded. Other files go through the line-wise
+        reader. Both produce the same text as reading the file in text mode.
+        """
+        with open(filepath, "rb") as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Empty files and non-regular files cannot be mapped
+                buf = None
+
+            if buf is not None:
+                with buf:
+                    if (
+                        not self.ignore_from
+                        and buf[:5] == b"From "
+                        and not _LONE_CR_RE.search(buf)
+                    ):
+                        yield from self._split_mbox_buffer(buf)
+                        return
+
+        yield from self._read_mbox_lines(filepath)
+
+    @staticmethod
+    def _split_mbox_buffer(buf: mmap.mmap) -> Iterator[EmailMessage]:
+        """Split a mapped mailbox that starts with a From_ line."""
+        # Text mode would translate CRLF; lone CRs were ruled out by the caller
+        translate_crlf = buf.find(b"\r") != -1
+
+        # Each message starts on the line after its From_ line
+        start = buf.find(b"\n") + 1
+        while start:
+            end = buf.find(b"\nFrom ", start - 1)
+            if end == -1:
+                chunk = buf[start:]
+                start = 0
+            else:
+                chunk = buf[start : end + 1]
+                start = buf.find(b"\n", end + 1) + 1
+
+            try:
+                contents = [chunk.decode("utf-8")]
+            except UnicodeDecodeError:
+                # Dropping invalid bytes can leave a From_ line behind that
+                # the byte search did not see, so split the text again
+                contents = _FROM_LINE_RE.split(chunk.decode("utf-8", errors="ignore"))
+
+            for content in contents:
+                if translate_crlf:
+                    content = content.replace("\r\n", "\n")
+                if content:
+                    yield EmailMessage(content)
+
+    def _read_mbox_lines(self, filepath: Path) -> Iterator[EmailMessage]:
+        """
+        Read messages from an mbox format file line by line.
+
+        The file is split on From_ lines in a single streaming pass, so
+        messages are yielded as they are read. Message text is passed on
+        unchanged (no >From unescaping), which keeps digests stable.
+        """
         with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
             current_message: List[str] = []
             in_message = False
@@ -263,24 +427,30 @@ class EmailMessageReader:
                 yield EmailMessage(message_content)
 
     def _read_maildir(self, maildir_path: Path) -> Iterator[EmailMessage]:
-        """Read messages from a Maildir format directory."""
-        try:
-            maildir = mailbox.Maildir(str(maildir_path))
-            for message in maildir:
-                yield EmailMessage(message)  # type: ignore
-        except Exception:
-            # Fallback to manual reading
-            for subdir in ["new", "cur"]:
-                subdir_path = maildir_path / subdir
-                if subdir_path.exists():
-                    for msg_file in subdir_path.iterdir():
-                        if msg_file.is_file() and not msg_file.name.startswith("."):
-                            try:
-                                with safe_open_text(msg_file) as f:
-                                    content = f.read()
-                                yield EmailMessage(content)
-                            except Exception:
-                                continue
+        """
+        Read messages from a Maildir format directory.
+
+        Messages are read from new/ and cur/ with one directory listing
+        each; tmp/ only holds deliveries in progress and is skipped.
+        """
+        for subdir in ("new", "cur"):
+            try:
+                with os.scandir(maildir_path / subdir) as entries:
+                    msg_files = [
+                        entry.path
+                        for entry in entries
+                        if not entry.name.startswith(".") and entry.is_file()
+                    ]
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            for msg_file in msg_files:
+                try:
+                    with safe_open_text(msg_file) as f:
+                        content = f.read()
+                    yield EmailMessage(content)
+                except Exception:
+                    continue
 
     def _is_mbox_format(self, content: str) -> bool:
         """Check if content appears to be in mbox format."""
@@ -301,32 +471,51 @@ class MessageDigestCache:
     Cache for message digests to track which messages have been processed.
 
     This helps avoid reprocessing the same message multiple times and
-    enables proper reclassification of messages.
+    enables proper reclassification of messages. When ``maxsize`` is given
+    the least recently added or looked-up digests are evicted once the cache
+    holds more than ``maxsize`` entries; the default keeps every entry.
     """
 
-    def __init__(self):
-        self._cache: Dict[str, bool] = {}  # digest -> is_spam
+    def __init__(self, maxsize: Optional[int] = None):
+        # Digest -> is_spam. With a maxsize, insertion order doubles as
+        # recency order, so lookups move an entry to the end.
+        self._data: Dict[str, bool] = {}
+        self.maxsize = maxsize
 
     def contains(self, digest: str) -> bool:
         """Check if a message digest is in the cache."""
-        return digest in self._cache
+        return digest in self._data
 
     def get_classification(self, digest: str) -> Optional[bool]:
         """Get the spam classification for a message digest."""
-        return self._cache.get(digest)
+        if self.maxsize is None:
+            return self._data.get(digest)
+
+        is_spam = self._data.pop(digest, None)
+        if is_spam is not None:
+            self._data[digest] = is_spam
+        return is_spam
 
     def add(self, digest: str, is_spam: bool) -> None:
         """Add a message digest to the cache with its classification."""
-        self._cache[digest] = is_spam
+        data = self._data
+        if self.maxsize is None:
+            data[digest] = is_spam
+            return
+
+        data.pop(digest, None)
+        data[digest] = is_spam
+        while len(data) > self.maxsize:
+            del data[next(iter(data))]
 
     def remove(self, digest: str) -> None:
         """Remove a message digest from the cache."""
-        self._cache.pop(digest, None)
+        self._data.pop(digest, None)
 
     def clear(self) -> None:
         """Clear all entries from the cache."""
-        self._cache.clear()
+        self._data.clear()
 
     def size(self) -> int:
         """Get the number of entries in the cache."""
-        return len(self._cache)
+        return len(self._data)
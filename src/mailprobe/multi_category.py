@@ -6,22 +6,61 @@ multiple categories and corpuses, allowing for flexible email classification
 into different folders or categories.
 """
 
+import functools
 import json
+import os
 import tempfile
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from .database import WordDatabase
 from .filter import FilterConfig, MailFilter
 from .message import EmailMessage, EmailMessageReader
+from .tokenizer import Token
+from .utils import is_message_text
+
+# Parsed messages kept by each MultiCategoryFilter for repeated text
+_PARSED_MESSAGE_CACHE_SIZE = 32
+
+# File name suffixes treated as email messages inside category folders
+_EMAIL_FILE_SUFFIXES = (".txt", ".eml", ".msg")
+
+
+def _load_and_tokenize(
+    email_files: List[str], config: FilterConfig
+) -> Tuple[List[str], List[List[Token]]]:
+    """
+    Read and tokenize email files.
+
+    Module level so it can run in worker processes.
+
+    Returns:
+        Tuple of (message digests, token lists)
+    """
+    reader = EmailMessageReader()
+    tokenizer = config.create_tokenizer()
+
+    digests: List[str] = []
+    token_lists: List[List[Token]] = []
+    for email_file in email_files:
+        for message in reader.read_from_file(email_file):
+            digests.append(message.digest)
+            token_lists.append(tokenizer.tokenize_message(message))
+
+    return digests, token_lists
 
 
 @dataclass
 class CategoryResult:
     """Result of multi-category classification."""
 
+    # Declared by hand as dataclass(slots=True) needs Python 3.10
+    __slots__ = ("category", "probability", "confidence", "all_scores")
+
     category: str
     probability: float
     confidence: float
@@ -37,6 +76,13 @@ class CategoryResult:
 class CategoryTrainingResult:
     """Result of category training operation."""
 
+    __slots__ = (
+        "category",
+        "messages_processed",
+        "messages_updated",
+        "database_updated",
+    )
+
     category: str
     messages_processed: int
     messages_updated: int
@@ -101,6 +147,18 @@ class MultiCategoryFilter:
             category_db_path = self.database_path / f"{category}_vs_others"
             self.filters[category] = MailFilter(category_db_path, self.config)
 
+        # All category filters share one configuration, so a message only
+        # needs to be tokenized once and its tokens can be reused by each
+        self.tokenizer = self.config.create_tokenizer()
+
+        # The same text arriving again (a retry, or a classification
+        # followed by training) reuses the message parsed from it, with its
+        # headers, body, digest and tokens. Kept per filter, so no message
+        # outlives or is shared beyond it.
+        self._parse_text = functools.lru_cache(maxsize=_PARSED_MESSAGE_CACHE_SIZE)(
+            EmailMessage
+        )
+
     def train_category(
         self,
         category: str,
@@ -126,27 +184,78 @@ class MultiCategoryFilter:
         # Convert messages to list of EmailMessage objects
         email_messages = self._get_messages_from_source(messages)
 
-        processed = 0
+        # Tokenize each message once and share the tokens with every filter
+        return self.train_category_tokenized(
+            category,
+            [message.digest for message in email_messages],
+            [m.get_tokens(self.tokenizer) for m in email_messages],
+            force_update,
+        )
+
+    def train_category_tokenized(
+        self,
+        category: str,
+        digests: List[str],
+        token_lists: List[List[Token]],
+        force_update: bool = False,
+    ) -> CategoryTrainingResult:
+        """
+        Train on already tokenized messages for a specific category.
+
+        Args:
+            category: Category name to train
+            digests: Message digest of each message
+            token_lists: Tokens of each message, in the same order
+            force_update: Force database update even if message was seen before
+
+        Returns:
+            CategoryTrainingResult with statistics
+        """
+        if category not in self.categories:
+            raise ValueError(
+                f"Unknown category: {category}. Available: {self.categories}"
+            )
+
         updated = 0
 
-        # Train each filter
+        # Each filter applies the whole batch as a single aggregated update
         for filter_category, spam_filter in self.filters.items():
-            for message in email_messages:
-                processed += 1
-                # For the target category filter, train as "not spam" (positive)
-                # For other category filters, train as "spam" (negative)
-                is_spam = filter_category != category
+            # For the target category filter, train as "not spam" (positive)
+            # For other category filters, train as "spam" (negative)
+            is_spam = filter_category != category
 
-                if spam_filter.train_message(message, is_spam, force_update):
-                    updated += 1
+            updated += spam_filter.train_tokenized(
+                digests, token_lists, is_spam, force_update
+            )
 
         return CategoryTrainingResult(
             category=category,
-            messages_processed=len(email_messages),
+            messages_processed=len(digests),
             messages_updated=updated,
             database_updated=updated > 0,
         )
 
+    @property
+    def is_frozen(self) -> bool:
+        """Whether every category filter scores from a frozen table."""
+        return all(spam_filter.is_frozen for spam_filter in self.filters.values())
+
+    def freeze(self) -> None:
+        """
+        Precompute term probabilities of every category for classification.
+
+        Classification then scores each message against in-memory tables,
+        one per category, without database access. Training a category
+        changes every filter and so unfreezes them all again.
+        """
+        for spam_filter in self.filters.values():
+            spam_filter.freeze()
+
+    def unfreeze(self) -> None:
+        """Return every category filter to scoring against its database."""
+        for spam_filter in self.filters.values():
+            spam_filter.unfreeze()
+
     def classify(
         self,
         message_source: Union[str, Path, EmailMessage],
@@ -164,10 +273,12 @@ class MultiCategoryFilter:
         """
         message = self._get_message(message_source)
 
+        tokens = message.get_tokens(self.tokenizer)
+
         # Get scores from each category filter
         scores = {}
         for category, spam_filter in self.filters.items():
-            score = spam_filter.score_message(message)
+            score = spam_filter.score_tokens(tokens)
             # Convert spam probability to category probability
             # If spam_filter thinks it's "not spam", it belongs to this category
             category_prob = 1.0 - score.probability
@@ -307,8 +418,12 @@ class MultiCategoryFilter:
             },
         }
 
+        # Serialize to one string first: json.dump with indent streams many
+        # tiny writes to the file
+        content = json.dumps(config_data, indent=2)
+
         with open(config_file, "w") as f:
-            json.dump(config_data, f, indent=2)
+            f.write(content)
 
     @classmethod
     def load_configuration(cls, config_file: Union[str, Path]) -> "MultiCategoryFilter":
@@ -321,8 +436,8 @@ class MultiCategoryFilter:
         Returns:
             MultiCategoryFilter instance
         """
-        with open(config_file, "r") as f:
-            config_data = json.load(f)
+        # Read in one call; json.loads detects the encoding of the bytes
+        config_data = json.loads(Path(config_file).read_bytes())
 
         # Create FilterConfig from saved data
         filter_config = FilterConfig(**config_data["filter_config"])
@@ -345,16 +460,15 @@ class MultiCategoryFilter:
         if isinstance(message_source, EmailMessage):
             return message_source
         elif isinstance(message_source, (str, Path)):
-            path = Path(message_source)
-            if path.exists():
-                # It's a file path
-                messages = list(self.message_reader.read_from_file(path))
-                if not messages:
-                    raise ValueError(f"No messages found in {path}")
-                return messages[0]
-            else:
+            if is_message_text(message_source):
                 # It's email content as string
-                return EmailMessage(str(message_source))
+                return self._parse_text(str(message_source))
+
+            # It's a file path
+            messages = list(self.message_reader.read_from_file(message_source))
+            if not messages:
+                raise ValueError(f"No messages found in {message_source}")
+            return messages[0]
         else:
             raise ValueError(f"Invalid message source type: {type(message_source)}")
 
@@ -364,23 +478,21 @@ class MultiCategoryFilter:
         """Get list of messages from various sources."""
         if isinstance(source, (str, Path)):
             # Single source
-            path = Path(source)
-            if path.exists():
-                return list(self.message_reader.read_from_file(path))
-            else:
-                return [EmailMessage(str(source))]
+            if is_message_text(source):
+                return [self._parse_text(str(source))]
+            return list(self.message_reader.read_from_file(source))
         elif isinstance(source, list):
-            # List of sources
+            # List of sources; each is parsed exactly once here and the
+            # resulting messages are shared by every category filter
             messages = []
             for item in source:
                 if isinstance(item, EmailMessage):
                     messages.append(item)
                 elif isinstance(item, (str, Path)):
-                    path = Path(item)
-                    if path.exists():
-                        messages.extend(self.message_reader.read_from_file(path))
+                    if is_message_text(item):
+                        messages.append(self._parse_text(str(item)))
                     else:
-                        messages.append(EmailMessage(str(item)))
+                        messages.extend(self.message_reader.read_from_file(item))
             return messages
         else:
             raise ValueError(f"Invalid source type: {type(source)}")
@@ -450,47 +562,77 @@ class FolderBasedClassifier:
 
     def _discover_categories(self) -> List[str]:
         """Discover categories from folder structure."""
-        if not self.base_path.exists():
-            raise ValueError(f"Base path does not exist: {self.base_path}")
-
-        categories = []
-        for item in self.base_path.iterdir():
-            if (
-                item.is_dir()
-                and item.name not in self.exclude_folders
-                and not item.name.startswith(".")
-            ):
-                categories.append(item.name)
+        # Entry types come from the directory listing, so only symlinked
+        # entries need a stat to tell whether they point at a folder
+        try:
+            with os.scandir(self.base_path) as entries:
+                categories = [
+                    entry.name
+                    for entry in entries
+                    if not entry.name.startswith(".")
+                    and entry.name not in self.exclude_folders
+                    and entry.is_dir()
+                ]
+        except FileNotFoundError:
+            raise ValueError(f"Base path does not exist: {self.base_path}") from None
 
         return sorted(categories)
 
     def train_from_folders(
-        self, force_update: bool = False
+        self, force_update: bool = False, max_workers: Optional[int] = None
     ) -> Dict[str, CategoryTrainingResult]:
         """
         Train classifier from all category folders.
 
+        Reading and tokenizing the email files is independent per category,
+        so with ``max_workers`` above 1 it runs in a process pool. The
+        database updates are always applied in this process, in category
+        order.
+
         Args:
             force_update: Force database update even if message was seen before
+            max_workers: Maximum number of worker processes, further capped by
+                the number of folders and CPUs (None or 1 trains serially)
 
         Returns:
             Dictionary mapping category names to training results
         """
-        results = {}
+        folder_files: Dict[str, List[str]] = {}
 
         for category in self.categories:
             category_path = self.base_path / category
-            if category_path.exists() and category_path.is_dir():
-                # Get all email files in the category folder
-                email_files: List[Path] = []
-                for ext in ["*.txt", "*.eml", "*.msg"]:
-                    email_files.extend(category_path.glob(ext))
-
-                if email_files:
-                    result = self.classifier.train_category(
-                        category, email_files, force_update
+
+            # List the folder once instead of globbing it per extension. The
+            # name test runs first and is_file() answers from the cached
+            # directory entry type, so only symlinks cost an extra stat.
+            try:
+                with os.scandir(category_path) as entries:
+                    email_files = sorted(
+                        entry.path
+                        for entry in entries
+                        if entry.name.endswith(_EMAIL_FILE_SUFFIXES) and entry.is_file()
                     )
-                    results[category] = result
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            if email_files:
+                folder_files[category] = email_files
+
+        load = partial(_load_and_tokenize, config=self.classifier.config)
+
+        # More workers than folders or CPUs would only add process start-up
+        workers = min(max_workers or 1, len(folder_files), os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                loaded = list(executor.map(load, folder_files.values()))
+        else:
+            loaded = [load(email_files) for email_files in folder_files.values()]
+
+        results = {}
+        for category, (digests, token_lists) in zip(folder_files, loaded):
+            results[category] = self.classifier.train_category_tokenized(
+                category, digests, token_lists, force_update
+            )
 
         return results
 
@@ -607,7 +749,9 @@ def classify_into_categories(
 
 
 def train_from_folder_structure(
-    base_path: Union[str, Path], database_path: Optional[Union[str, Path]] = None
+    base_path: Union[str, Path],
+    database_path: Optional[Union[str, Path]] = None,
+    max_workers: Optional[int] = None,
 ) -> Dict[str, CategoryTrainingResult]:
     """
     Quick function to train from a folder structure.
@@ -615,9 +759,10 @@ def train_from_folder_structure(
     Args:
         base_path: Base directory containing category folders
         database_path: Optional database path
+        max_workers: Number of worker processes used to read and tokenize
 
     Returns:
         Dictionary with training results for each category
     """
     with FolderBasedClassifier(base_path, database_path) as classifier:
-        return classifier.train_from_folders()
+        return classifier.train_from_folders(max_workers=max_workers)
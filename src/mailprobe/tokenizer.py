@@ -13,10 +13,74 @@ from email.header import decode_header
 from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
+# Patterns compiled once at import and shared by every tokenizer
+
+# Word boundary pattern - letters, numbers, some punctuation
+_WORD_RE = re.compile(r"[a-zA-Z0-9_\-\.]+")
+
+# HTML tag pattern
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+
+# URL pattern (simplified). A bare domain can only match from the start of
+# a run of domain characters, so the lookbehind skips retrying it at every
+# later position of the run, which made long dotless runs quadratic.
+_URL_RE = re.compile(
+    r'https?://[^\s<>"{}|\\^`\[\]]+|'
+    r'www\.[^\s<>"{}|\\^`\[\]]+|'
+    r'(?<![a-zA-Z0-9\-])[a-zA-Z0-9\-]+\.[a-zA-Z]{2,}[^\s<>"{}|\\^`\[\]]*'
+)
+
+# Email pattern
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")
+
+# Whitespace normalization
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Hostnames and IP addresses in Received headers
+_HOSTNAME_RE = re.compile(r"\b([a-zA-Z0-9\-]+\.)+[a-zA-Z]{2,}\b")
+_IP_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
+
+# Default prefixes of the header tokens, copied into each tokenizer. Other
+# headers derive theirs from the header name.
+_HEADER_PREFIXES = {
+    "from": "HFrom",
+    "to": "HTo",
+    "cc": "HCc",
+    "bcc": "HBcc",
+    "subject": "HSubject",
+    "received": "HReceived",
+    "reply-to": "HReplyTo",
+    "sender": "HSender",
+    "x-mailer": "HXMailer",
+    "user-agent": "HUserAgent",
+    "message-id": "HMessageId",
+    "references": "HReferences",
+    "in-reply-to": "HInReplyTo",
+}
+
+# Prefixes derived from other header names, shared by every tokenizer
+_DERIVED_PREFIXES: Dict[str, str] = {}
+_MAX_DERIVED_PREFIXES = 1024
+
+# Term normalization
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7F]")
+
 
 class Token:
     """Represents a token extracted from an email message."""
 
+    # A message produces thousands of tokens, so skip the per-instance dict
+    __slots__ = (
+        "text",
+        "flags",
+        "prefix",
+        "count",
+        "spam_count",
+        "good_count",
+        "probability",
+        "_key",
+    )
+
     # Token flags (similar to original MailProbe)
     FLAG_WORD = 1
     FLAG_PHRASE = 2
@@ -40,12 +104,15 @@ class Token:
         self.spam_count = 0
         self.good_count = 0
         self.probability = 0.5
+        self._key: Optional[str] = None
 
     def get_key(self) -> str:
-        """Get the database key for this token."""
-        if self.prefix:
-            return f"{self.prefix}_{self.text}"
-        return self.text
+        """Get the database key for this token, built on first use."""
+        key = self._key
+        if key is None:
+            key = f"{self.prefix}_{self.text}" if self.prefix else self.text
+            self._key = key
+        return key
 
     def is_phrase(self) -> bool:
         """Check if this token is a phrase (multiple words)."""
@@ -68,6 +135,13 @@ class Token:
         return self.__str__()
 
 
+# Flags of the tokens the tokenizer creates, combined once at import
+_HEADER_WORD_FLAGS = Token.FLAG_WORD | Token.FLAG_HEADER
+_BODY_WORD_FLAGS = Token.FLAG_WORD | Token.FLAG_BODY
+_BODY_URL_FLAGS = Token.FLAG_URL | Token.FLAG_BODY
+_SOURCE_FLAGS = Token.FLAG_HEADER | Token.FLAG_BODY
+
+
 class EmailTokenizer:
     """
     Tokenizes email messages to extract words and phrases for spam analysis.
@@ -112,48 +186,36 @@ class EmailTokenizer:
         self.replace_non_ascii = replace_non_ascii
 
         # Header prefixes for different types of headers
-        self.header_prefixes = {
-            "from": "HFrom",
-            "to": "HTo",
-            "cc": "HCc",
-            "bcc": "HBcc",
-            "subject": "HSubject",
-            "received": "HReceived",
-            "reply-to": "HReplyTo",
-            "sender": "HSender",
-            "x-mailer": "HXMailer",
-            "user-agent": "HUserAgent",
-            "message-id": "HMessageId",
-            "references": "HReferences",
-            "in-reply-to": "HInReplyTo",
-        }
+        self.header_prefixes = _HEADER_PREFIXES.copy()
 
         # Compile regex patterns
         self._compile_patterns()
 
     def _compile_patterns(self) -> None:
-        """Compile regex patterns for tokenization."""
-        # Word boundary pattern - letters, numbers, some punctuation
-        self.word_pattern = re.compile(r"[a-zA-Z0-9_\-\.]+")
-
-        # HTML tag pattern
-        self.html_tag_pattern = re.compile(r"<[^>]*>")
-
-        # URL pattern (simplified)
-        self.url_pattern = re.compile(
-            r'https?://[^\s<>"{}|\\^`\[\]]+|'
-            r'www\.[^\s<>"{}|\\^`\[\]]+|'
-            r'[a-zA-Z0-9\-]+\.[a-zA-Z]{2,}[^\s<>"{}|\\^`\[\]]*'
-        )
-
-        # Email pattern
-        self.email_pattern = re.compile(
-            r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+        """Bind the shared compiled regex patterns for tokenization."""
+        self.word_pattern = _WORD_RE
+        self.html_tag_pattern = _HTML_TAG_RE
+        self.url_pattern = _URL_RE
+        self.email_pattern = _EMAIL_RE
+        self.whitespace_pattern = _WHITESPACE_RE
+
+    @property
+    def config_key(self) -> Tuple[Any, ...]:
+        """Settings that determine the tokens produced for a message."""
+        # Customized header prefixes change the tokens too; the common
+        # default table is keyed as None rather than sorted on every call
+        prefixes = self.header_prefixes
+        return (
+            self.max_phrase_terms,
+            self.min_phrase_terms,
+            self.min_term_length,
+            self.max_term_length,
+            self.remove_html,
+            self.ignore_body,
+            self.replace_non_ascii,
+            (None if prefixes == _HEADER_PREFIXES else tuple(sorted(prefixes.items()))),
         )
 
-        # Whitespace normalization
-        self.whitespace_pattern = re.compile(r"\s+")
-
     def tokenize_message(self, message: Any) -> List[Token]:
         """
         Tokenize an email message and return list of tokens.
@@ -189,8 +251,16 @@ class EmailTokenizer:
         # Decode header if needed
         decoded_value = self._decode_header(header_value)
 
-        # Get prefix for this header type
-        prefix = self.header_prefixes.get(header_name, f"H{header_name.title()}")
+        # Get prefix for this header type. Derived prefixes are kept so the
+        # tokens of every message share one string per header name, up to a
+        # bound, as header names come from untrusted mail.
+        prefix = self.header_prefixes.get(header_name)
+        if prefix is None:
+            prefix = _DERIVED_PREFIXES.get(header_name)
+            if prefix is None:
+                prefix = f"H{header_name.title()}"
+                if len(_DERIVED_PREFIXES) < _MAX_DERIVED_PREFIXES:
+                    _DERIVED_PREFIXES[header_name] = prefix
 
         # Special handling for received headers
         if header_name == "received":
@@ -198,15 +268,9 @@ class EmailTokenizer:
             tokens.extend(self._tokenize_received_header(decoded_value, prefix))
         else:
             # Regular tokenization
-            words = self._extract_words(decoded_value)
-            for word in words:
-                if self._is_valid_term(word):
-                    token = Token(
-                        text=self._normalize_term(word),
-                        flags=Token.FLAG_WORD | Token.FLAG_HEADER,
-                        prefix=prefix,
-                    )
-                    tokens.append(token)
+            flags = _HEADER_WORD_FLAGS
+            for word in self._extract_words(decoded_value):
+                tokens.append(Token(text=word, flags=flags, prefix=prefix))
 
         return tokens
 
@@ -226,14 +290,9 @@ class EmailTokenizer:
             decoded_body = self._remove_html(decoded_body)
 
         # Extract words from body
-        words = self._extract_words(decoded_body)
-        for word in words:
-            if self._is_valid_term(word):
-                token = Token(
-                    text=self._normalize_term(word),
-                    flags=Token.FLAG_WORD | Token.FLAG_BODY,
-                )
-                tokens.append(token)
+        flags = _BODY_WORD_FLAGS
+        for word in self._extract_words(decoded_body):
+            tokens.append(Token(text=word, flags=flags))
 
         return tokens
 
@@ -241,27 +300,21 @@ class EmailTokenizer:
         """Special tokenization for Received headers to extract hostnames."""
         tokens = []
 
-        # Extract hostnames and IP addresses
-        hostname_pattern = re.compile(r"\b([a-zA-Z0-9\-]+\.)+[a-zA-Z]{2,}\b")
-        ip_pattern = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
-
         # Find hostnames
-        for match in hostname_pattern.finditer(header_value):
+        for match in _HOSTNAME_RE.finditer(header_value):
             hostname = match.group().lower()
             if len(hostname) >= self.min_term_length:
                 token = Token(
                     text=hostname,
-                    flags=Token.FLAG_WORD | Token.FLAG_HEADER,
+                    flags=_HEADER_WORD_FLAGS,
                     prefix=prefix,
                 )
                 tokens.append(token)
 
         # Find IP addresses
-        for match in ip_pattern.finditer(header_value):
+        for match in _IP_RE.finditer(header_value):
             ip = match.group()
-            token = Token(
-                text=ip, flags=Token.FLAG_WORD | Token.FLAG_HEADER, prefix=prefix
-            )
+            token = Token(text=ip, flags=_HEADER_WORD_FLAGS, prefix=prefix)
             tokens.append(token)
 
         return tokens
@@ -285,7 +338,7 @@ class EmailTokenizer:
 
                     token = Token(
                         text=domain,
-                        flags=Token.FLAG_URL | Token.FLAG_BODY,
+                        flags=_BODY_URL_FLAGS,
                         prefix="URL",
                     )
                     tokens.append(token)
@@ -300,7 +353,7 @@ class EmailTokenizer:
                     for part in path_parts[:3]:  # Limit to first 3 path components
                         token = Token(
                             text=self._normalize_term(part),
-                            flags=Token.FLAG_URL | Token.FLAG_BODY,
+                            flags=_BODY_URL_FLAGS,
                             prefix="URLPath",
                         )
                         tokens.append(token)
@@ -313,7 +366,7 @@ class EmailTokenizer:
                 ):
                     token = Token(
                         text=self._normalize_term(url),
-                        flags=Token.FLAG_URL | Token.FLAG_BODY,
+                        flags=_BODY_URL_FLAGS,
                         prefix="URL",
                     )
                     tokens.append(token)
@@ -321,64 +374,82 @@ class EmailTokenizer:
         return tokens
 
     def _extract_words(self, text: str) -> List[str]:
-        """Extract individual words from text."""
-        words = []
-
-        for match in self.word_pattern.finditer(text):
-            word = match.group()
-            if len(word) >= self.min_term_length and len(word) <= self.max_term_length:
-                words.append(word)
-
-        return words
+        """
+        Extract valid, normalized words from text in a single pass.
+
+        Words matched by ``word_pattern`` are kept when their length is
+        between ``min_term_length`` and ``max_term_length`` and they are not
+        made up only of "_", "-" and "." characters, then lowercased. ASCII
+        text is lowercased once up front instead of word by word; other text
+        is not, since lowercasing some non-ASCII characters yields ASCII
+        letters the pattern would then match.
+        """
+        min_length = self.min_term_length
+        max_length = self.max_term_length
+
+        if text.isascii():
+            return [
+                word
+                for word in self.word_pattern.findall(text.lower())
+                if min_length <= len(word) <= max_length and word.strip("_-.")
+            ]
+
+        return [
+            word.lower()
+            for word in self.word_pattern.findall(text)
+            if min_length <= len(word) <= max_length and word.strip("_-.")
+        ]
 
     def _generate_phrases(self, tokens: List[Token]) -> List[Token]:
-        """Generate multi-word phrases from word tokens."""
-        if self.max_phrase_terms <= 1:
+        """
+        Generate multi-word phrases from word tokens.
+
+        The phrases starting at a word are built by extending the previous,
+        shorter phrase by one word, so each window of up to
+        ``max_phrase_terms`` words is walked once rather than rejoined for
+        every phrase length.
+        """
+        max_terms = self.max_phrase_terms
+        if max_terms <= 1:
             return []
 
-        phrase_tokens = []
+        # A phrase has at least two words
+        min_terms = max(self.min_phrase_terms, 2)
+        # Flags read into locals, as the loops below test them per token
+        word_flag = Token.FLAG_WORD
+        phrase_flag = Token.FLAG_PHRASE
+        source_flags = _SOURCE_FLAGS
 
         # Group tokens by type (header prefix or body)
         token_groups: Dict[str, List[Token]] = {}
         for token in tokens:
-            if token.flags & Token.FLAG_WORD:
+            if token.flags & word_flag:
                 key = token.prefix if token.prefix else "body"
-                if key not in token_groups:
-                    token_groups[key] = []
-                token_groups[key].append(token)
+                group = token_groups.get(key)
+                if group is None:
+                    token_groups[key] = group = []
+                group.append(token)
+
+        phrase_tokens = []
 
         # Generate phrases within each group
         for group_tokens in token_groups.values():
-            if len(group_tokens) < self.min_phrase_terms:
-                continue
-
-            for i in range(len(group_tokens)):
-                for phrase_len in range(
-                    self.min_phrase_terms,
-                    min(self.max_phrase_terms + 1, len(group_tokens) - i + 1),
-                ):
-                    if phrase_len == 1:
-                        continue  # Skip single words
-
-                    phrase_words = []
-                    phrase_prefix = None
-                    phrase_flags = Token.FLAG_PHRASE
-
-                    for j in range(phrase_len):
-                        token = group_tokens[i + j]
-                        phrase_words.append(token.text)
-                        if phrase_prefix is None:
-                            phrase_prefix = token.prefix
-                        if token.flags & Token.FLAG_HEADER:
-                            phrase_flags |= Token.FLAG_HEADER
-                        if token.flags & Token.FLAG_BODY:
-                            phrase_flags |= Token.FLAG_BODY
-
-                    phrase_text = " ".join(phrase_words)
-                    phrase_token = Token(
-                        text=phrase_text, flags=phrase_flags, prefix=phrase_prefix
-                    )
-                    phrase_tokens.append(phrase_token)
+            count = len(group_tokens)
+
+            for i in range(count - min_terms + 1):
+                first = group_tokens[i]
+                prefix = first.prefix
+                phrase_text = first.text
+                phrase_flags = phrase_flag | (first.flags & source_flags)
+
+                for j in range(i + 1, min(i + max_terms, count)):
+                    token = group_tokens[j]
+                    phrase_text = f"{phrase_text} {token.text}"
+                    phrase_flags |= token.flags & source_flags
+                    if j - i + 1 >= min_terms:
+                        phrase_tokens.append(
+                            Token(text=phrase_text, flags=phrase_flags, prefix=prefix)
+                        )
 
         return phrase_tokens
 
@@ -407,7 +478,7 @@ class EmailTokenizer:
         # MIME multipart messages and different encodings properly
         try:
             # Try base64 decode
-            if body.replace("\n", "").replace("\r", "").replace(" ", "").isalnum():
+            if self._is_alnum_body(body):
                 try:
                     decoded = base64.b64decode(body).decode("utf-8", errors="ignore")
                     if decoded.isprintable():
@@ -415,11 +486,12 @@ class EmailTokenizer:
                 except Exception:
                     pass
 
-            # Try quoted-printable decode
+            # Try quoted-printable decode. Without an escape the decoded text
+            # equals the body, so skip building two copies of it.
+            if "=" not in body:
+                return body
             try:
-                decoded = quopri.decodestring(body).decode("utf-8", errors="ignore")
-                if "=" not in body or decoded != body:
-                    return decoded
+                return quopri.decodestring(body).decode("utf-8", errors="ignore")
             except Exception:
                 pass
 
@@ -427,10 +499,29 @@ class EmailTokenizer:
         except Exception:
             return body
 
+    def _is_alnum_body(self, body: str) -> bool:
+        """
+        Check whether a body is alphanumeric apart from spaces and newlines.
+
+        Most bodies already fail the check within their first line, so a
+        short head is tested before copying the whole body.
+        """
+
+        def strip(text: str) -> str:
+            return text.replace("\n", "").replace("\r", "").replace(" ", "")
+
+        head = strip(body[:256])
+        if head and not head.isalnum():
+            return False
+        return strip(body).isalnum()
+
     def _remove_html(self, text: str) -> str:
         """Remove HTML tags from text content."""
-        # Remove HTML tags
-        text = self.html_tag_pattern.sub(" ", text)
+        # Remove HTML tags. Nothing after the last ">" can be a tag, and
+        # leaving it out keeps the backtracking matcher linear: each "<"
+        # with no ">" after it would otherwise rescan the rest of the text.
+        tags_end = text.rfind(">") + 1
+        text = self.html_tag_pattern.sub(" ", text[:tags_end]) + text[tags_end:]
 
         # Decode HTML entities
         text = html.unescape(text)
@@ -440,24 +531,18 @@ class EmailTokenizer:
 
         return text.strip()
 
-    def _is_valid_term(self, term: str) -> bool:
-        """Check if a term is valid for tokenization."""
-        if len(term) < self.min_term_length or len(term) > self.max_term_length:
-            return False
-
-        # Must contain at least one letter or number
-        if not re.search(r"[a-zA-Z0-9]", term):
-            return False
-
-        return True
-
     def _normalize_term(self, term: str) -> str:
         """Normalize a term for consistent storage."""
         # Convert to lowercase
         term = term.lower()
 
-        # Replace non-ASCII characters if configured
-        if self.replace_non_ascii and self.replace_non_ascii != -1:
-            term = re.sub(r"[^\x00-\x7F]", self.replace_non_ascii, term)
+        # Replace non-ASCII characters if configured. Most terms are plain
+        # ASCII, which isascii() answers without scanning them in a regex.
+        if (
+            self.replace_non_ascii
+            and self.replace_non_ascii != -1
+            and not term.isascii()
+        ):
+            term = _NON_ASCII_RE.sub(self.replace_non_ascii, term)
 
         return term
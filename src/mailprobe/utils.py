@@ -113,6 +113,25 @@ def get_default_database_path() -> Path:
         return normalize_path(Path.home() / ".mailprobe-py")
 
 
+def is_message_text(source: Union[str, Path]) -> bool:
+    """
+    Check whether a message source is raw message text rather than a path.
+
+    A string containing a line break is always message text, so it is not
+    looked up on disk (where a long line can even fail as a file name).
+    Anything else is message text unless it names an existing path.
+
+    Args:
+        source: Raw message text or path to a message file or mailbox
+
+    Returns:
+        True if the source should be parsed as message text
+    """
+    if isinstance(source, str) and "\n" in source:
+        return True
+    return not os.path.exists(source)
+
+
 def is_windows() -> bool:
     """Check if running on Windows."""
     return os.name == "nt"
@@ -0,0 +1,95 @@
+"""Shared pytest fixtures."""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+from click.testing import CliRunner
+
+from mailprobe.api import MailProbeAPI
+from mailprobe.cli import cli
+from mailprobe.message import EmailMessage
+
+GOOD_EMAIL_TEXT = """From: friend@example.com
+Subject: Lunch meeting
+
+Let's meet for lunch tomorrow at noon.
+"""
+
+SPAM_EMAIL_TEXT = """From: spammer@badsite.com
+Subject: FREE MONEY NOW!!!
+
+Click here to get FREE MONEY! Limited time offer!
+"""
+
+_SHM_DIR = "/dev/shm"
+_SHM_BASETEMP = pytest.StashKey[str]()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Keep temporary test databases on tmpfs when the platform has one."""
+    if config.option.basetemp or hasattr(config, "workerinput"):
+        # Respect --basetemp and the per-worker directories xdist assigns
+        return
+    if os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK):
+        # A directory of its own per session, as pytest empties a given
+        # basetemp first and concurrent runs would wipe each other's files
+        basetemp = tempfile.mkdtemp(prefix="mailprobe-tests-", dir=_SHM_DIR)
+        config.option.basetemp = config.stash[_SHM_BASETEMP] = basetemp
+
+
+def pytest_unconfigure(config):
+    """Free the tmpfs directory, which pytest leaves behind when given one."""
+    basetemp = config.stash.get(_SHM_BASETEMP, None)
+    if basetemp is not None:
+        shutil.rmtree(basetemp, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def _template_db(tmp_path_factory):
+    """Build an initialized database directory once per test session."""
+    path = tmp_path_factory.mktemp("template_db")
+    api = MailProbeAPI(path)
+    # Access filter to trigger schema creation
+    _ = api.filter
+    api.close()
+    return path
+
+
+@pytest.fixture
+def db_path(_template_db, tmp_path):
+    """Provide a fresh copy of the template database for a single test."""
+    path = tmp_path / "db"
+    shutil.copytree(_template_db, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def _cli_template_db(tmp_path_factory):
+    """Create a database through the CLI once per test session."""
+    path = tmp_path_factory.mktemp("cli_template") / "test_db"
+    result = CliRunner().invoke(cli, ["-d", str(path), "create-db"])
+    assert result.exit_code == 0
+    return path
+
+
+@pytest.fixture
+def cli_db(_cli_template_db, tmp_path):
+    """Provide a fresh copy of the CLI-created database for a single test."""
+    path = tmp_path / "test_db"
+    shutil.copytree(_cli_template_db, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def good_email():
+    """Parse the shared good test message once per session."""
+    return EmailMessage(GOOD_EMAIL_TEXT)
+
+
+@pytest.fixture(scope="session")
+def spam_email():
+    """Parse the shared spam test message once per session."""
+    return EmailMessage(SPAM_EMAIL_TEXT)
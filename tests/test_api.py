@@ -1,8 +1,5 @@
 """Tests for the high-level API."""
 
-import tempfile
-from pathlib import Path
-
 import pytest
 
 from mailprobe.api import (
@@ -14,36 +11,41 @@ from mailprobe.api import (
     get_spam_probability,
     train_from_directories,
 )
-from mailprobe.message import EmailMessage
 
 
-class TestMailProbeAPI:
-    """Test cases for MailProbeAPI."""
+@pytest.fixture(scope="class")
+def api(tmp_path_factory):
+    """Share one API instance across the tests of a class."""
+    api = MailProbeAPI(tmp_path_factory.mktemp("api"))
+    yield api
+    api.close()
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir)
-        self.api = MailProbeAPI(self.db_path)
 
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        self.api.close()
-        import shutil
+class TestMailProbeAPI:
+    """Test cases for MailProbeAPI."""
 
-        shutil.rmtree(self.temp_dir)
+    @pytest.fixture(autouse=True)
+    def setup_api(self, api):
+        """Set up test fixtures, resetting the shared database afterwards."""
+        self.api = api
+        self.db_path = api.database_path
+        yield
+        api.reset_database()
 
-    def test_api_initialization(self):
+    def test_api_initialization(self, tmp_path):
         """Test API initialization."""
+        api = MailProbeAPI(tmp_path)
+
         # Use resolved paths to handle macOS symlinks (/var -> /private/var)
-        assert self.api.database_path.resolve() == self.db_path.resolve()
-        assert self.api.config is not None
+        assert api.database_path.resolve() == tmp_path.resolve()
+        assert api.config is not None
 
         # Database should be created
-        db_file = self.db_path / "words.db"
+        db_file = tmp_path / "words.db"
         # Access filter to trigger database creation
-        _ = self.api.filter
+        _ = api.filter
         assert db_file.exists()
+        api.close()
 
     def test_classify_text_basic(self):
         """Test basic text classification."""
@@ -64,41 +66,45 @@ This is a test message.
         assert 0.0 <= detailed.probability <= 1.0
         assert 0.0 <= detailed.confidence <= 1.0
 
-    def test_classify_message_object(self):
-        """Test classification with EmailMessage object."""
-        message = EmailMessage(
-            """From: test@example.com
-Subject: Test
+    def test_classify_text_cache(self, tmp_path):
+        """Test classify_text memoization is opt-in and cleared by training."""
+        email_content = "From: spammer@bad.com\nSubject: FREE\n\nFree money now!"
 
-Hello world!
-"""
-        )
+        self.api.classify_text(email_content)
+        assert not self.api._classify_cache
 
-        result = self.api.classify(message)
-        assert isinstance(result, bool)
+        api = MailProbeAPI(tmp_path, classify_cache_size=16)
+        try:
+            first = api.classify_text(email_content, return_details=True)
+            assert len(api._classify_cache) == 1
 
-    def test_get_spam_probability(self):
-        """Test getting spam probability."""
-        email_content = """From: test@example.com
-Subject: Test
+            second = api.classify_text(email_content, return_details=True)
+            assert second == first
+            assert second is not first
 
-Hello world!
-"""
+            api.train_message(email_content, is_spam=True)
+            assert not api._classify_cache
 
-        prob = self.api.get_spam_probability(email_content)
+            api.classify_text(email_content)
+            assert len(api._classify_cache) == 1
+        finally:
+            api.close()
+
+    def test_classify_message_object(self, good_email):
+        """Test classification with EmailMessage object."""
+        result = self.api.classify(good_email)
+        assert isinstance(result, bool)
+
+    def test_get_spam_probability(self, spam_email):
+        """Test getting spam probability."""
+        prob = self.api.get_spam_probability(spam_email)
         assert isinstance(prob, float)
         assert 0.0 <= prob <= 1.0
 
-    def test_train_message(self):
+    def test_train_message(self, good_email):
         """Test training on individual messages."""
-        email_content = """From: friend@example.com
-Subject: Meeting
-
-Let's meet for lunch tomorrow.
-"""
-
         # Train as good message
-        updated = self.api.train_message(email_content, is_spam=False)
+        updated = self.api.train_message(good_email, is_spam=False)
         assert isinstance(updated, bool)
 
         # Check database stats
@@ -134,6 +140,14 @@ Click here to get FREE MONEY! Limited time offer!
         assert stats["good_message_count"] >= 1
         assert stats["spam_message_count"] >= 1
 
+    def test_train_long_content(self):
+        """Test message text with long lines is not mistaken for a path."""
+        email = "Subject: Long\n\n" + "word " * 100
+
+        result = self.api.train_good(email)
+        assert result.messages_processed == 1
+        assert isinstance(self.api.classify(email), bool)
+
     def test_selective_training(self):
         """Test selective training mode."""
         email_content = """From: test@example.com
@@ -199,6 +213,24 @@ This is a test message.
         imported = self.api.restore_database(backup_file)
         assert imported > 0
 
+    def test_backup_restore_round_trip(self):
+        """Test a backup restores exactly the exported word counts."""
+        self.api.train_message(
+            'From: test@example.com\nSubject: "Quoted" test\n\nHello there',
+            is_spam=False,
+        )
+        exported = self.api.export_database()
+
+        backup_file = self.db_path / "backup.csv"
+        self.api.backup_database(backup_file)
+        lines = backup_file.read_text().splitlines()
+        assert lines[0] == "term,good_count,spam_count"
+        assert lines[1].startswith('"')
+
+        self.api.reset_database()
+        assert self.api.restore_database(backup_file) == len(exported)
+        assert self.api.export_database() == exported
+
     def test_cleanup_database(self):
         """Test database cleanup."""
         # Train some messages
@@ -222,19 +254,14 @@ This is a test message.
 class TestBatchMailFilter:
     """Test cases for BatchMailFilter."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir)
-        self.api = MailProbeAPI(self.db_path)
+    @pytest.fixture(autouse=True)
+    def setup_api(self, api):
+        """Set up test fixtures, resetting the shared database afterwards."""
+        self.api = api
+        self.db_path = api.database_path
         self.batch_filter = BatchMailFilter(self.api)
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        self.api.close()
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        yield
+        api.reset_database()
 
     def test_classify_batch(self):
         """Test batch classification."""
@@ -256,6 +283,89 @@ class TestBatchMailFilter:
         assert len(detailed_results) == len(messages)
         assert all(isinstance(r, ClassificationResult) for r in detailed_results)
 
+    def test_classify_batch_matches_single(self):
+        """Test batch classification agrees with single classification."""
+        self.api.train_message(
+            "From: friend@example.com\nSubject: Lunch\n\nLunch tomorrow?",
+            is_spam=False,
+        )
+        self.api.train_message(
+            "From: spammer@bad.com\nSubject: FREE\n\nFree money now!",
+            is_spam=True,
+        )
+
+        messages = [
+            "From: friend@example.com\nSubject: Lunch\n\nLunch today?",
+            "From: spammer@bad.com\nSubject: FREE\n\nFree money!",
+        ]
+
+        batch = self.batch_filter.classify_batch(messages, return_details=True)
+        single = [self.api.classify_text(m, return_details=True) for m in messages]
+
+        assert [r.probability for r in batch] == [r.probability for r in single]
+        assert [r.digest for r in batch] == [r.digest for r in single]
+
+    def test_classify_batch_blocks(self):
+        """Test block-wise scoring gives the same results as one block."""
+        messages = [
+            f"From: test{i}@example.com\nSubject: Test {i}\n\nHello {i}"
+            for i in range(5)
+        ]
+
+        whole = self.batch_filter.classify_batch(messages, return_details=True)
+        blocked = BatchMailFilter(self.api, block_size=2).classify_batch(
+            messages, return_details=True
+        )
+
+        assert [r.digest for r in blocked] == [r.digest for r in whole]
+        assert [r.probability for r in blocked] == [r.probability for r in whole]
+
+    def test_classify_batch_scoring_failure(self, monkeypatch):
+        """Test a message that fails scoring does not fail its whole block."""
+        messages = [
+            f"From: test{i}@example.com\nSubject: Test {i}\n\nHello {i}"
+            for i in range(3)
+        ]
+        spam_filter = self.api.filter
+        score_messages = spam_filter.score_messages
+
+        def fail_on_second(batch):
+            if any(m.get_header("subject") == "Test 1" for m in batch):
+                raise RuntimeError("bad message")
+            return score_messages(batch)
+
+        monkeypatch.setattr(spam_filter, "score_messages", fail_on_second)
+
+        results = self.batch_filter.classify_batch(messages, return_details=True)
+
+        assert [bool(r.digest) for r in results] == [True, False, True]
+
+    def test_classify_batch_parallel_loading(self):
+        """Test threaded source loading preserves order and failures."""
+        email_file = self.db_path / "message.eml"
+        email_file.write_text("From: file@example.com\nSubject: File\n\nFrom disk")
+
+        sources = [
+            "From: test1@example.com\nSubject: Test 1\n\nHello 1",
+            email_file,
+            "From: test2@example.com\nSubject: Test 2\n\nHello 2",
+        ]
+
+        serial = BatchMailFilter(self.api, max_workers=1).classify_batch(
+            sources, return_details=True
+        )
+        parallel = BatchMailFilter(self.api, max_workers=4).classify_batch(
+            sources, return_details=True
+        )
+
+        assert [r.digest for r in parallel] == [r.digest for r in serial]
+        assert all(r.digest for r in parallel)
+
+        pipelined = BatchMailFilter(
+            self.api, max_workers=4, block_size=1
+        ).classify_batch(sources, return_details=True)
+        assert [r.digest for r in pipelined] == [r.digest for r in serial]
+
     def test_train_batch(self):
         """Test batch training."""
         good_messages = [
@@ -281,16 +391,10 @@ class TestBatchMailFilter:
 class TestConvenienceFunctions:
     """Test cases for convenience functions."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir)
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.db_path = db_path
 
     def test_classify_email_function(self):
         """Test classify_email convenience function."""
@@ -370,3 +474,23 @@ class TestTrainingResult:
         str_repr = str(result)
         assert "processed=10" in str_repr
         assert "updated=5" in str_repr
+
+
+class TestPackageExports:
+    """Test cases for the package-level lazy exports."""
+
+    def test_all_names_resolve(self):
+        """Test every name in __all__ is importable from the package."""
+        import mailprobe
+
+        for name in mailprobe.__all__:
+            assert getattr(mailprobe, name) is not None
+
+        assert mailprobe.MailProbeAPI is MailProbeAPI
+
+    def test_unknown_name(self):
+        """Test unknown attributes still raise AttributeError."""
+        import mailprobe
+
+        with pytest.raises(AttributeError):
+            mailprobe.does_not_exist
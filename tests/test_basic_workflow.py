@@ -0,0 +1,57 @@
+"""End-to-end test of basic MailProbe-Py functionality."""
+
+from mailprobe.filter import FilterConfig, MailFilter
+from mailprobe.message import EmailMessage
+
+
+class TestBasicWorkflow:
+    """Train, score and inspect a filter from scratch."""
+
+    def test_basic_workflow(self, db_path):
+        """Test training on one good and one spam message, then scoring."""
+        spam_filter = MailFilter(db_path, FilterConfig())
+
+        good_message = EmailMessage(
+            """From: friend@example.com
+Subject: Lunch meeting
+
+Let's meet for lunch tomorrow at noon. Looking forward to seeing you!
+"""
+        )
+        spam_message = EmailMessage(
+            """From: spammer@badsite.com
+Subject: FREE MONEY NOW!!!
+
+Click here to get FREE MONEY! Limited time offer!
+Buy now! Act fast! Don't miss out!
+"""
+        )
+
+        assert spam_filter.train_message(good_message, is_spam=False)
+        assert spam_filter.train_message(spam_message, is_spam=True)
+
+        test_good = EmailMessage(
+            """Subject: Project meeting
+
+Let's discuss the project timeline."""
+        )
+        test_spam = EmailMessage(
+            """Subject: URGENT!!!
+
+FREE money! Click now! Limited offer!"""
+        )
+
+        good_score = spam_filter.score_message(test_good)
+        spam_score = spam_filter.score_message(test_spam)
+
+        assert 0.0 <= good_score.probability <= 1.0
+        assert 0.0 <= spam_score.probability <= 1.0
+        assert good_score.probability <= spam_score.probability
+        assert not good_score.is_spam
+
+        info = spam_filter.get_database_info()
+        assert info["word_count"] > 0
+        assert info["good_message_count"] == 1
+        assert info["spam_message_count"] == 1
+
+        spam_filter.close()
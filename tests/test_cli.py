@@ -1,7 +1,6 @@
 """Tests for the command-line interface."""
 
-import tempfile
-from pathlib import Path
+import os
 
 import pytest
 from click.testing import CliRunner
@@ -9,20 +8,21 @@ from click.testing import CliRunner
 from mailprobe.cli import cli
 
 
+@pytest.fixture(scope="class")
+def runner():
+    """Share one CliRunner per test class; each invoke() isolates its streams."""
+    return CliRunner()
+
+
 class TestCLI:
     """Test cases for CLI commands."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_runner(self, runner, tmp_path):
         """Set up test fixtures."""
-        self.runner = CliRunner()
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test_db"
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.runner = runner
+        self.temp_dir = tmp_path
+        self.db_path = tmp_path / "test_db"
 
     def test_cli_help(self):
         """Test CLI help command."""
@@ -38,13 +38,10 @@ class TestCLI:
         assert "Database created successfully" in result.output
         assert (self.db_path / "words.db").exists()
 
-    def test_info_command(self):
+    def test_info_command(self, cli_db):
         """Test info command."""
-        # First create database
-        self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
-
-        # Then get info
-        result = self.runner.invoke(cli, ["-d", str(self.db_path), "info"])
+        # Get info
+        result = self.runner.invoke(cli, ["-d", str(cli_db), "info"])
 
         assert result.exit_code == 0
         assert "Database Information:" in result.output
@@ -52,13 +49,11 @@ class TestCLI:
         assert "Good messages:" in result.output
         assert "Spam messages:" in result.output
 
-    def test_train_commands_with_files(self):
+    def test_train_commands_with_files(self, cli_db):
         """Test training commands with email files."""
         # Create test email files
-        good_email = self.db_path / "good.txt"
-        spam_email = self.db_path / "spam.txt"
-
-        good_email.parent.mkdir(parents=True, exist_ok=True)
+        good_email = cli_db / "good.txt"
+        spam_email = cli_db / "spam.txt"
 
         good_email.write_text(
             """From: friend@example.com
@@ -76,32 +71,24 @@ Click here to get FREE MONEY! Limited time offer!
 """
         )
 
-        # Create database
-        self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
-
         # Train on good email
-        result = self.runner.invoke(
-            cli, ["-d", str(self.db_path), "good", str(good_email)]
-        )
+        result = self.runner.invoke(cli, ["-d", str(cli_db), "good", str(good_email)])
         assert result.exit_code == 0
 
         # Train on spam email
-        result = self.runner.invoke(
-            cli, ["-d", str(self.db_path), "spam", str(spam_email)]
-        )
+        result = self.runner.invoke(cli, ["-d", str(cli_db), "spam", str(spam_email)])
         assert result.exit_code == 0
 
         # Check database has been updated
-        result = self.runner.invoke(cli, ["-d", str(self.db_path), "info"])
+        result = self.runner.invoke(cli, ["-d", str(cli_db), "info"])
         assert result.exit_code == 0
         assert "Good messages: 1" in result.output
         assert "Spam messages: 1" in result.output
 
-    def test_score_command_with_file(self):
+    def test_score_command_with_file(self, cli_db):
         """Test score command with email file."""
         # Create test email
-        test_email = self.db_path / "test.txt"
-        test_email.parent.mkdir(parents=True, exist_ok=True)
+        test_email = cli_db / "test.txt"
         test_email.write_text(
             """From: test@example.com
 Subject: Test message
@@ -110,23 +97,17 @@ This is a test message.
 """
         )
 
-        # Create database
-        self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
-
         # Score the email
-        result = self.runner.invoke(
-            cli, ["-d", str(self.db_path), "score", str(test_email)]
-        )
+        result = self.runner.invoke(cli, ["-d", str(cli_db), "score", str(test_email)])
 
         assert result.exit_code == 0
         # Should output either GOOD or SPAM followed by probability
         assert "GOOD" in result.output or "SPAM" in result.output
 
-    def test_score_with_show_terms(self):
+    def test_score_with_show_terms(self, cli_db):
         """Test score command with -T flag to show terms."""
         # Create test email
-        test_email = self.db_path / "test.txt"
-        test_email.parent.mkdir(parents=True, exist_ok=True)
+        test_email = cli_db / "test.txt"
         test_email.write_text(
             """From: test@example.com
 Subject: Test message
@@ -135,28 +116,22 @@ This is a test message with some words.
 """
         )
 
-        # Create database and add some training data
-        self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
-
         # Score with terms
         result = self.runner.invoke(
-            cli, ["-d", str(self.db_path), "score", "-T", str(test_email)]
+            cli, ["-d", str(cli_db), "score", "-T", str(test_email)]
         )
 
         assert result.exit_code == 0
         assert "GOOD" in result.output or "SPAM" in result.output
 
-    def test_cleanup_command(self):
+    def test_cleanup_command(self, cli_db):
         """Test cleanup command."""
-        # Create database
-        self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
-
         # Run cleanup
         result = self.runner.invoke(
             cli,
             [
                 "-d",
-                str(self.db_path),
+                str(cli_db),
                 "cleanup",
                 "--max-count",
                 "2",
@@ -168,24 +143,20 @@ This is a test message with some words.
         assert result.exit_code == 0
         assert "Removed" in result.output and "words" in result.output
 
-    def test_purge_command(self):
+    def test_purge_command(self, cli_db):
         """Test purge command."""
-        # Create database
-        self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
-
         # Run purge
         result = self.runner.invoke(
-            cli, ["-d", str(self.db_path), "purge", "--max-count", "1"]
+            cli, ["-d", str(cli_db), "purge", "--max-count", "1"]
         )
 
         assert result.exit_code == 0
         assert "Purged" in result.output and "words" in result.output
 
-    def test_verbose_flag(self):
+    def test_verbose_flag(self, cli_db):
         """Test verbose flag."""
         # Create test email
-        test_email = self.db_path / "test.txt"
-        test_email.parent.mkdir(parents=True, exist_ok=True)
+        test_email = cli_db / "test.txt"
         test_email.write_text(
             """From: test@example.com
 Subject: Test
@@ -194,13 +165,10 @@ Hello world!
 """
         )
 
-        # Create database
-        self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
-
         # Train with verbose flag
         result = self.runner.invoke(
             cli,
-            ["-d", str(self.db_path), "-v", "good", str(test_email)],  # verbose flag
+            ["-d", str(cli_db), "-v", "good", str(test_email)],  # verbose flag
         )
 
         assert result.exit_code == 0
@@ -236,7 +204,7 @@ Hello world!
 
     def test_missing_database_directory(self):
         """Test behavior with missing database directory."""
-        nonexistent_path = Path(self.temp_dir) / "nonexistent"
+        nonexistent_path = self.temp_dir / "nonexistent"
 
         result = self.runner.invoke(cli, ["-d", str(nonexistent_path), "info"])
 
@@ -248,17 +216,12 @@ Hello world!
 class TestCLIIntegration:
     """Integration tests for CLI workflow."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_runner(self, runner, tmp_path):
         """Set up test fixtures."""
-        self.runner = CliRunner()
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "integration_db"
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.runner = runner
+        self.temp_dir = tmp_path
+        self.db_path = tmp_path / "integration_db"
 
     def test_full_workflow(self):
         """Test complete email classifiering workflow."""
@@ -276,30 +239,30 @@ class TestCLIIntegration:
             "From: scammer@evil.com\nSubject: URGENT\n\nYou've won a million dollars!",
         ]
 
-        # Create email files
-        for i, email in enumerate(good_emails):
-            (emails_dir / f"good{i}.txt").write_text(email)
+        # Create email files, keeping their paths for the CLI arguments
+        prefix = str(emails_dir)
+        good_files = [
+            os.path.join(prefix, f"good{i}.txt") for i in range(len(good_emails))
+        ]
+        spam_files = [
+            os.path.join(prefix, f"spam{i}.txt") for i in range(len(spam_emails))
+        ]
 
-        for i, email in enumerate(spam_emails):
-            (emails_dir / f"spam{i}.txt").write_text(email)
+        for path, email in zip(good_files + spam_files, good_emails + spam_emails):
+            with open(path, "w") as f:
+                f.write(email)
 
         # Step 1: Create database
         result = self.runner.invoke(cli, ["-d", str(self.db_path), "create-db"])
         assert result.exit_code == 0
 
-        # Step 2: Train on good emails
-        for i in range(len(good_emails)):
-            result = self.runner.invoke(
-                cli, ["-d", str(self.db_path), "good", str(emails_dir / f"good{i}.txt")]
-            )
-            assert result.exit_code == 0
-
-        # Step 3: Train on spam emails
-        for i in range(len(spam_emails)):
-            result = self.runner.invoke(
-                cli, ["-d", str(self.db_path), "spam", str(emails_dir / f"spam{i}.txt")]
-            )
-            assert result.exit_code == 0
+        # Step 2: Train on all good emails in one invocation
+        result = self.runner.invoke(cli, ["-d", str(self.db_path), "good", *good_files])
+        assert result.exit_code == 0
+
+        # Step 3: Train on all spam emails in one invocation
+        result = self.runner.invoke(cli, ["-d", str(self.db_path), "spam", *spam_files])
+        assert result.exit_code == 0
 
         # Step 4: Check database info
         result = self.runner.invoke(cli, ["-d", str(self.db_path), "info"])
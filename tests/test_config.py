@@ -1,7 +1,7 @@
 """Tests for configuration management."""
 
 import json
-import tempfile
+import os
 from pathlib import Path
 
 import pytest
@@ -95,20 +95,28 @@ class TestConfigClasses:
         assert path.is_absolute()
         assert path.exists()  # Should be created
 
+    def test_get_database_path_cached(self, tmp_path):
+        """Test the resolved path is reused until the configured path changes."""
+        config = MailProbeConfig()
+        config.database.path = str(tmp_path / "first")
+
+        path = config.get_database_path()
+        assert config.get_database_path() is path
+
+        config.database.path = str(tmp_path / "second")
+        other = config.get_database_path()
+        assert other == (tmp_path / "second").resolve()
+        assert other.exists()
+
 
 class TestConfigManager:
     """Test cases for ConfigManager."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_config_file(self, tmp_path):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_file = Path(self.temp_dir) / "test_config.json"
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.temp_dir = tmp_path
+        self.config_file = tmp_path / "test_config.json"
 
     def test_config_manager_creation(self):
         """Test ConfigManager creation."""
@@ -148,6 +156,31 @@ class TestConfigManager:
         assert loaded_config.scoring.spam_threshold == 0.8
         assert loaded_config.verbose is True
 
+    def test_load_config_rereads_file(self):
+        """Test every load reads the file, even after a same-size rewrite."""
+        config = MailProbeConfig()
+        config.database.cache_size = 5000
+
+        manager = ConfigManager(self.config_file)
+        manager.save_config(config)
+
+        first = manager.load_config()
+        second = manager.load_config()
+        assert second == first
+        assert second is not first
+        assert second.database is not first.database
+
+        # Mutating a loaded config must not leak into the next load
+        first.database.cache_size = 1
+        assert manager.load_config().database.cache_size == 5000
+
+        # A rewrite of the same length within one mtime tick is still seen
+        st = os.stat(self.config_file)
+        config.database.cache_size = 6000
+        manager.save_config(config)
+        os.utime(self.config_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert manager.load_config().database.cache_size == 6000
+
     def test_update_from_args(self):
         """Test updating config from command line arguments."""
         manager = ConfigManager()
@@ -227,16 +260,11 @@ class TestConfigManager:
 class TestConvenienceFunctions:
     """Test cases for convenience functions."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_config_file(self, tmp_path):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_file = Path(self.temp_dir) / "test_config.json"
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.temp_dir = tmp_path
+        self.config_file = tmp_path / "test_config.json"
 
     def test_load_config_function(self):
         """Test load_config convenience function."""
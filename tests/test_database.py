@@ -1,8 +1,8 @@
 """Tests for the word frequency database."""
 
-import tempfile
-import time
-from pathlib import Path
+import itertools
+import sqlite3
+from types import SimpleNamespace
 
 import pytest
 
@@ -39,21 +39,22 @@ class TestWordData:
 
         assert prob_rare == 0.4
 
-    def test_update_counts(self):
+    def test_update_counts(self, monkeypatch):
         """Test updating word counts."""
-        word = WordData("test", good_count=5, spam_count=3)
-        original_time = word.last_update
+        # Replace the module's time reference, not the process-wide time.time
+        clock = itertools.count(1000.0)
+        monkeypatch.setattr(
+            "mailprobe.database.time", SimpleNamespace(time=lambda: next(clock))
+        )
 
-        # Wait a moment to ensure timestamp changes
-        time.sleep(0.1)  # Increase sleep time for more reliable timestamp difference
+        word = WordData("test", good_count=5, spam_count=3)
+        assert word.last_update == 1000
 
         word.update_counts(2, -1)
 
         assert word.good_count == 7
         assert word.spam_count == 2
-        assert (
-            word.last_update >= original_time
-        )  # Use >= instead of > for more reliable test
+        assert word.last_update == 1001
 
         # Test that counts don't go below zero
         word.update_counts(-10, -5)
@@ -61,21 +62,29 @@ class TestWordData:
         assert word.spam_count == 0
 
 
+@pytest.fixture(scope="class")
+def shared_db(tmp_path_factory):
+    """One database per test class, emptied after each test."""
+    db = WordDatabase(tmp_path_factory.mktemp("db") / "test.db")
+    yield db
+    db.close()
+
+
 class TestWordDatabase:
     """Test cases for WordDatabase."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_db(self, shared_db):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test.db"
-        self.db = WordDatabase(self.db_path)
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        self.db.close()
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.db = shared_db
+        self.db_path = shared_db.db_path
+        yield
+        with shared_db._get_connection() as conn:
+            conn.execute("DELETE FROM words")
+            conn.execute("DELETE FROM messages")
+            conn.commit()
+        # Drop cached words and counts along with the connection
+        shared_db.close()
 
     def test_database_creation(self):
         """Test database creation and initialization."""
@@ -112,6 +121,21 @@ class TestWordDatabase:
         assert word_data.good_count == 7
         assert word_data.spam_count == 4
 
+    def test_bulk_word_lookup(self):
+        """Test fetching word data for many terms at once."""
+        updates = {"alpha": (5, 3), "beta": (2, 8), "gamma": (10, 1)}
+        self.db.update_word_counts(updates)
+
+        # Prime the cache with one term so both paths are exercised
+        self.db.get_word_data("alpha")
+
+        found = self.db.get_words_data(["alpha", "beta", "missing", "beta"])
+
+        assert set(found) == {"alpha", "beta"}
+        assert found["alpha"].good_count == 5
+        assert found["beta"].spam_count == 8
+        assert self.db.get_words_data([]) == {}
+
     def test_message_tracking(self):
         """Test message digest tracking."""
         digest = "abc123def456"
@@ -153,6 +177,45 @@ class TestWordDatabase:
         assert good_count == 1
         assert spam_count == 2
 
+        # Cached totals must follow later updates
+        self.db.add_message("msg4", False)
+        assert self.db.get_message_counts() == (2, 2)
+
+        self.db.remove_message("msg1")
+        assert self.db.get_message_counts() == (2, 1)
+
+        # Re-adding a digest under the other class moves it between totals
+        self.db.add_message("msg2", True)
+        assert self.db.get_message_counts() == (1, 2)
+
+        # Totals are persisted, so a fresh instance sees the same values
+        with WordDatabase(self.db_path) as reopened:
+            assert reopened.get_message_counts() == (1, 2)
+
+    def test_message_totals_upgrade(self):
+        """Test totals are built from existing messages on first open."""
+        self.db.add_messages([("a", False), ("b", True), ("c", True)])
+
+        conn = sqlite3.connect(str(self.db_path))
+        for trigger in ("replace", "insert", "delete"):
+            conn.execute(f"DROP TRIGGER message_totals_{trigger}")
+        conn.execute("DROP TABLE message_totals")
+        conn.commit()
+        conn.close()
+
+        with WordDatabase(self.db_path) as upgraded:
+            assert upgraded.get_message_counts() == (1, 2)
+
+    def test_counts_follow_other_connections(self):
+        """Test cached totals pick up changes made by another instance."""
+        assert self.db.get_counts() == (0, 0, 0)
+
+        with WordDatabase(self.db_path) as other:
+            other.add_messages([("a", False), ("b", True)])
+            other.update_word_counts({"word": (1, 0), "term": (0, 1)})
+
+        assert self.db.get_counts() == (2, 1, 1)
+
     def test_cleanup_operations(self):
         """Test database cleanup operations."""
         # Add some words with different counts
@@ -184,11 +247,18 @@ class TestWordDatabase:
         assert final_count < initial_count
         assert removed > 0
 
+        # Maintained count must agree with a fresh scan
+        self.db._word_count = None
+        assert self.db.get_word_count() == final_count == initial_count - removed
+
+        self.db.update_word_counts({"brand_new": (1, 0)})
+        assert self.db.get_word_count() == final_count + 1
+
         # "common" should still exist
         word_data = self.db.get_word_data("common")
         assert word_data is not None
 
-    def test_export_import(self):
+    def test_export_import(self, tmp_path):
         """Test database export and import."""
         # Add some test data
         updates = {"word1": (5, 3), "word2": (2, 8), "word3": (10, 1)}
@@ -208,7 +278,7 @@ class TestWordDatabase:
             assert spam_count >= 0
 
         # Create new database and import
-        new_db_path = Path(self.temp_dir) / "new_test.db"
+        new_db_path = tmp_path / "new_test.db"
         new_db = WordDatabase(new_db_path)
 
         imported_count = new_db.import_words(iter(exported))
@@ -247,6 +317,12 @@ class TestWordDatabase:
         assert info["spam_message_count"] >= 1
         assert info["total_message_count"] >= 2
 
+        assert self.db.get_counts() == (
+            info["word_count"],
+            info["good_message_count"],
+            info["spam_message_count"],
+        )
+
     def test_cache_functionality(self):
         """Test word caching functionality."""
         # Add word to database
@@ -262,6 +338,24 @@ class TestWordDatabase:
         assert word_data2 is not None
         assert word_data2.term == word_data1.term
 
+    def test_connection_reuse(self):
+        """Test the connection is shared between calls and reopened after close."""
+        with self.db._get_connection() as conn1:
+            pass
+        with self.db._get_connection() as conn2:
+            assert conn2 is conn1
+
+        # A failed statement must not leave a transaction open
+        with pytest.raises(sqlite3.OperationalError):
+            with self.db._get_connection() as conn:
+                conn.execute("INSERT INTO words (term) VALUES ('partial')")
+                conn.execute("SELECT * FROM missing_table")
+        assert self.db.get_word_data("partial") is None
+
+        self.db.close()
+        self.db.update_word_counts({"reopened": (1, 0)})
+        assert self.db.get_word_data("reopened").good_count == 1
+
     def test_concurrent_updates(self):
         """Test handling of concurrent word updates."""
         # Simulate concurrent updates to same word
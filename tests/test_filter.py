@@ -1,30 +1,24 @@
 """Tests for the email classifier."""
 
-import tempfile
-from pathlib import Path
-
 import pytest
 
 from mailprobe.filter import FilterConfig, MailFilter, MailScore
 from mailprobe.message import EmailMessage
+from mailprobe.tokenizer import Token
 
 
 class TestMailFilter:
     """Test cases for MailFilter."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_filter(self, tmp_path):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir)
+        self.temp_dir = tmp_path
+        self.db_path = tmp_path
         self.config = FilterConfig()
         self.filter = MailFilter(self.db_path, self.config)
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
+        yield
         self.filter.close()
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
 
     def test_filter_initialization(self):
         """Test filter initialization."""
@@ -69,10 +63,10 @@ Let's meet for lunch tomorrow at noon.
         assert updated  # Should update database for new message
 
         # Check database was updated
-        info = self.filter.get_database_info()
-        assert info["good_message_count"] == 1
-        assert info["spam_message_count"] == 0
-        assert info["word_count"] > 0
+        word_count, good_count, spam_count = self.filter.get_counts()
+        assert good_count == 1
+        assert spam_count == 0
+        assert word_count > 0
 
     def test_train_spam_message(self):
         """Test training on a spam message."""
@@ -90,10 +84,10 @@ Buy now! Act fast! Don't miss out!
         assert updated  # Should update database for new message
 
         # Check database was updated
-        info = self.filter.get_database_info()
-        assert info["good_message_count"] == 0
-        assert info["spam_message_count"] == 1
-        assert info["word_count"] > 0
+        word_count, good_count, spam_count = self.filter.get_counts()
+        assert good_count == 0
+        assert spam_count == 1
+        assert word_count > 0
 
     def test_scoring_after_training(self):
         """Test that scoring improves after training."""
@@ -171,17 +165,17 @@ This is a test message.
 
         # Train as good first
         self.filter.train_message(message, is_spam=False)
-        info1 = self.filter.get_database_info()
+        _, good1, spam1 = self.filter.get_counts()
 
         # Reclassify as spam
         updated = self.filter.train_message(message, is_spam=True, force_update=True)
         assert updated
 
-        info2 = self.filter.get_database_info()
+        _, good2, spam2 = self.filter.get_counts()
 
         # Message counts should have changed
-        assert info2["good_message_count"] == info1["good_message_count"] - 1
-        assert info2["spam_message_count"] == info1["spam_message_count"] + 1
+        assert good2 == good1 - 1
+        assert spam2 == spam1 + 1
 
     def test_remove_message(self):
         """Test removing a message from database."""
@@ -195,16 +189,16 @@ This is a test message.
 
         # Train the message
         self.filter.train_message(message, is_spam=False)
-        info1 = self.filter.get_database_info()
+        _, good1, _ = self.filter.get_counts()
 
         # Remove the message
         removed = self.filter.remove_message(message)
         assert removed
 
-        info2 = self.filter.get_database_info()
+        _, good2, _ = self.filter.get_counts()
 
         # Message count should decrease
-        assert info2["good_message_count"] == info1["good_message_count"] - 1
+        assert good2 == good1 - 1
 
     def test_database_cleanup(self):
         """Test database cleanup functionality."""
@@ -248,6 +242,80 @@ This is a test message.
         # Import should work (tested with new filter instance)
         # This is a basic test - full import testing would need a separate database
 
+    def test_train_messages_matches_sequential(self):
+        """Test batch training gives the same database as one-by-one training."""
+        first = EmailMessage("From: a@example.com\nSubject: One\n\nFirst message")
+        second = EmailMessage("From: b@example.com\nSubject: Two\n\nSecond one")
+        batch = [first, second, first]
+
+        other = MailFilter(self.db_path / "sequential", self.config)
+        try:
+            for f in (self.filter, other):
+                f.train_message(first, is_spam=False)
+
+            # Includes a duplicate and a reclassification of a known message
+            expected = sum(other.train_message(m, is_spam=True) for m in batch)
+            updated = self.filter.train_messages(batch, is_spam=True)
+
+            assert updated == expected == 2
+            assert self.filter.export_database() == other.export_database()
+            assert (
+                self.filter.database.get_message_counts()
+                == other.database.get_message_counts()
+            )
+        finally:
+            other.close()
+
+    def test_score_leaves_shared_tokens_unchanged(self):
+        """Test scoring does not write counts into the message's tokens."""
+        spam = EmailMessage("From: spam@bad.com\nSubject: FREE\n\nFree free money!")
+        for _ in range(6):
+            self.filter.train_message(spam, is_spam=True, force_update=True)
+
+        tokens = spam.get_tokens(self.filter.tokenizer)
+        first = self.filter.score_message(spam)
+        second = self.filter.score_message(spam)
+
+        assert first.top_terms == second.top_terms
+        assert all(token.count == 1 for token in tokens)
+        assert all(token.probability == 0.5 for token in tokens)
+
+    def test_freeze(self):
+        """Test frozen scoring matches live scoring until retrained."""
+        good = EmailMessage("From: friend@example.com\nSubject: Lunch\n\nLunch?")
+        spam = EmailMessage("From: spam@bad.com\nSubject: FREE\n\nFree money!")
+        for _ in range(3):
+            self.filter.train_message(good, is_spam=False, force_update=True)
+            self.filter.train_message(spam, is_spam=True, force_update=True)
+
+        live = [self.filter.score_message(m).probability for m in (good, spam)]
+
+        self.filter.freeze()
+        assert self.filter.is_frozen
+        frozen = [self.filter.score_message(m).probability for m in (good, spam)]
+        assert frozen == live
+
+        # Training must invalidate the frozen table
+        self.filter.train_message(good, is_spam=True)
+        assert not self.filter.is_frozen
+
+    def test_bayesian_probability_no_underflow(self):
+        """Test combining many strong tokens does not underflow to neutral."""
+        tokens = []
+        for i in range(40):
+            for probability in (0.01, 0.99):
+                token = Token(f"term{i}_{probability}")
+                token.probability = probability
+                token.count = 5
+                tokens.append(token)
+
+        # One extra spammy token should tip the balanced evidence
+        extra = Token("extra")
+        extra.probability = 0.9
+        tokens.append(extra)
+
+        assert self.filter._calculate_bayesian_probability(tokens) > 0.5
+
 
 class TestFilterConfig:
     """Test cases for FilterConfig."""
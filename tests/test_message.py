@@ -1,11 +1,16 @@
 """Tests for email message parsing."""
 
-import tempfile
 from pathlib import Path
 
 import pytest
 
-from mailprobe.message import EmailMessage, EmailMessageReader, MessageDigestCache
+from mailprobe.message import (
+    DIGEST_HEX_LEN,
+    EmailMessage,
+    EmailMessageReader,
+    MessageDigestCache,
+)
+from mailprobe.tokenizer import EmailTokenizer
 
 
 class TestEmailMessage:
@@ -43,12 +48,40 @@ Body content here.
         assert message.get_header("x-custom-header") == "Custom Value"
         assert message.get_header("nonexistent") == ""
         assert message.get_header("nonexistent", "default") == "default"
+        assert message.get_header("X-Custom-Header") == "Custom Value"
 
         # Test header existence
         assert message.has_header("from")
         assert message.has_header("subject")
+        assert message.has_header("Subject")
         assert not message.has_header("nonexistent")
 
+    def test_headers_match_policy_parse(self):
+        """Test header values match what the email policy would produce."""
+        content = (
+            "Received: from relay.example.com (relay [192.0.2.1])\r\n"
+            "\tby mx.example.org; Mon, 1 Jan 2024 10:00:00 +0000\r\n"
+            "Received: from origin.example.net\r\n"
+            "Subject: =?utf-8?q?caf=C3=A9?= menu\r\n"
+            'From: "Doe, Jane" <jane@example.com>\r\n'
+            "X-Note:  spaced\tvalue \r\n"
+            "X-Unicode: café\r\n"
+            "\r\n"
+            "Body\r\n"
+        )
+        message = EmailMessage(content)
+
+        expected = {}
+        for key, value in message._message.items():
+            key = key.lower()
+            expected[key] = f"{expected[key]} {value}" if key in expected else value
+
+        assert message.headers == expected
+        assert message.get_header("subject") == "café menu"
+        assert message.get_header("received").startswith(
+            "from relay.example.com (relay [192.0.2.1])\tby mx.example.org"
+        )
+
     def test_message_body_extraction(self):
         """Test body content extraction."""
         content = """Subject: Test
@@ -91,9 +124,24 @@ Different content!
         assert message1.digest != message3.digest
 
         # Digest should be 32 character hex string (MD5)
-        assert len(message1.digest) == 32
+        assert len(message1.digest) == DIGEST_HEX_LEN == 32
         assert all(c in "0123456789abcdef" for c in message1.digest)
 
+    def test_message_digest_memoized(self, monkeypatch):
+        """Test the digest is calculated once per message."""
+        message = EmailMessage("Subject: Once\n\nHash me once.\n")
+        calls = []
+        calculate = message._calculate_digest
+
+        def counting_calculate():
+            calls.append(1)
+            return calculate()
+
+        monkeypatch.setattr(message, "_calculate_digest", counting_calculate)
+
+        assert message.digest == message.digest
+        assert len(calls) == 1
+
     def test_multipart_message(self):
         """Test multipart message handling."""
         # This is a simplified test - in practice you'd need proper MIME structure
@@ -108,20 +156,56 @@ This is a multipart message.
         assert isinstance(message.body, str)
         assert message.get_header("subject") == "Multipart Test"
 
+    def test_multipart_body_parts(self):
+        """Test text parts of nested multipart messages form the body."""
+        content = """Subject: Nested
+Content-Type: multipart/mixed; boundary="outer"
+
+--outer
+Content-Type: multipart/alternative; boundary="inner"
+
+--inner
+Content-Type: text/plain; charset=utf-8
+
+Plain version
+--inner
+Content-Type: text/html; charset=utf-8
+
+<p>HTML version</p>
+--inner--
+--outer
+Content-Type: image/png
+Content-Transfer-Encoding: base64
+
+iVBORw0KGgo=
+--outer--
+"""
+        message = EmailMessage(content)
+
+        assert message.body == "Plain version\n<p>HTML version</p>"
+
+    def test_get_tokens_cached(self):
+        """Test tokens are cached per tokenizer configuration."""
+        message = EmailMessage("Subject: Cache Test\n\nHello token cache world.\n")
+
+        tokenizer = EmailTokenizer()
+        tokens = message.get_tokens(tokenizer)
+        assert tokens
+        assert message.get_tokens(EmailTokenizer()) is tokens
+
+        other = message.get_tokens(EmailTokenizer(max_phrase_terms=1))
+        assert other is not tokens
+        assert len(other) < len(tokens)
+
 
 class TestEmailMessageReader:
     """Test cases for EmailMessageReader."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_reader(self, tmp_path):
         """Set up test fixtures."""
         self.reader = EmailMessageReader()
-        self.temp_dir = tempfile.mkdtemp()
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.temp_dir = tmp_path
 
     def test_read_single_message_file(self):
         """Test reading a single message from file."""
@@ -166,6 +250,41 @@ This is the second message.
 
         assert len(messages) >= 1  # Should read at least one message
         # Note: mbox parsing might vary, so we just check basic functionality
+        assert [m.get_header("subject") for m in messages] == [
+            "First Message",
+            "Second Message",
+        ]
+
+    def test_read_mbox_file_matches_text_mode(self):
+        """Test CRLF and undecodable bytes split as in a text-mode read."""
+        mbox_bytes = (
+            b"From a@example.com Mon Jan  1 10:00:00 2024\r\n"
+            b"Subject: First\r\n\r\nBody one\r\n"
+            b"\xffFrom b@example.com Mon Jan  1 11:00:00 2024\r\n"
+            b"Subject: Second\r\n\r\nBody two\r\n"
+        )
+        mbox_file = Path(self.temp_dir) / "crlf.mbox"
+        mbox_file.write_bytes(mbox_bytes)
+
+        messages = list(self.reader._read_mbox_file(mbox_file))
+        lines = list(self.reader._read_mbox_lines(mbox_file))
+
+        assert [m.get_header("subject") for m in messages] == ["First", "Second"]
+        assert [m.body for m in messages] == [m.body for m in lines]
+        assert [m.digest for m in messages] == [m.digest for m in lines]
+
+    def test_read_long_single_message_file(self):
+        """Test a message longer than the mbox probe is read in full."""
+        body = "".join(f"Line {i} of the message body.\n" for i in range(200))
+        content = f"From: test@example.com\nSubject: Long\n\n{body}"
+
+        test_file = Path(self.temp_dir) / "long_email.txt"
+        test_file.write_text(content)
+
+        messages = list(self.reader.read_from_file(test_file))
+
+        assert len(messages) == 1
+        assert "Line 199 of the message body." in messages[0].body
 
     def test_read_from_string(self):
         """Test reading message from string."""
@@ -214,6 +333,20 @@ Message from string.
         assert "New Message" in subjects
         assert "Current Message" in subjects
 
+    def test_maildir_skips_tmp_and_hidden_files(self):
+        """Test only visible files in new/ and cur/ are read from a maildir."""
+        maildir = Path(self.temp_dir) / "skip_maildir"
+        for subdir in ("new", "cur", "tmp"):
+            (maildir / subdir).mkdir(parents=True)
+
+        (maildir / "new" / "msg1").write_text("Subject: Delivered\n\nBody.")
+        (maildir / "new" / ".hidden").write_text("Subject: Hidden\n\nBody.")
+        (maildir / "tmp" / "msg2").write_text("Subject: In Progress\n\nBody.")
+
+        messages = list(self.reader.read_from_file(maildir))
+
+        assert [m.get_header("subject") for m in messages] == ["Delivered"]
+
 
 class TestMessageDigestCache:
     """Test cases for MessageDigestCache."""
@@ -268,3 +401,17 @@ class TestMessageDigestCache:
 
         # Size should still be 1
         assert self.cache.size() == 1
+
+    def test_cache_maxsize_evicts_least_recent(self):
+        """Test a bounded cache evicts the least recently used digest."""
+        cache = MessageDigestCache(maxsize=2)
+
+        cache.add("a", True)
+        cache.add("b", False)
+        assert cache.get_classification("a") is True  # "a" is now most recent
+        cache.add("c", True)
+
+        assert cache.size() == 2
+        assert cache.contains("a")
+        assert not cache.contains("b")
+        assert cache.contains("c")
@@ -1,7 +1,6 @@
 """Tests for multi-category classification."""
 
 import json
-import tempfile
 from pathlib import Path
 
 import pytest
@@ -20,19 +19,15 @@ from mailprobe.multi_category import (
 class TestMultiCategoryFilter:
     """Test cases for MultiCategoryFilter."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_classifier(self, tmp_path):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir)
+        self.temp_dir = tmp_path
+        self.db_path = tmp_path
         self.categories = ["work", "personal", "newsletters", "spam"]
         self.classifier = MultiCategoryFilter(self.categories, self.db_path)
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
+        yield
         self.classifier.close()
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
 
     def test_classifier_initialization(self):
         """Test classifier initialization."""
@@ -100,6 +95,66 @@ class TestMultiCategoryFilter:
             assert category in result.all_scores
             assert 0.0 <= result.all_scores[category] <= 1.0
 
+    def test_classify_matches_per_filter_scores(self):
+        """Test shared tokenization gives the same scores as each filter."""
+        for category in self.categories:
+            emails = [
+                f"From: test@{category}.com\nSubject: {category}\n\nTest {category} email."
+            ]
+            self.classifier.train_category(category, emails)
+
+        test_email = EmailMessage(
+            "From: test@work.com\nSubject: work\n\nAnother work email."
+        )
+        result = self.classifier.classify(test_email, return_all_scores=True)
+
+        for category, spam_filter in self.classifier.filters.items():
+            expected = 1.0 - spam_filter.score_message(test_email).probability
+            assert result.all_scores[category] == pytest.approx(expected)
+
+    def test_train_category_long_content(self):
+        """Test message text with long lines is not mistaken for a path."""
+        email = "Subject: Long\n\n" + "word " * 100
+        result = self.classifier.train_category("work", [email])
+
+        assert result.messages_processed == 1
+        assert self.classifier.classify(email).category == "work"
+
+    def test_repeated_text_parsed_once_per_filter(self):
+        """Test repeated message text reuses the message this filter parsed."""
+        email = "Subject: Repeat\n\nParse me once.\n"
+        message = self.classifier._get_message(email)
+
+        assert self.classifier._get_message(email) is message
+        assert self.classifier._get_messages_from_source([email]) == [message]
+
+        other = MultiCategoryFilter(["work"], self.db_path / "other")
+        try:
+            assert other._get_message(email) is not message
+        finally:
+            other.close()
+
+    def test_freeze_keeps_scores(self):
+        """Test frozen classification gives the same scores until retrained."""
+        for category in self.categories:
+            emails = [
+                f"From: test@{category}.com\nSubject: {category}\n\nTest {category} email."
+            ]
+            self.classifier.train_category(category, emails)
+
+        test_email = EmailMessage(
+            "From: test@work.com\nSubject: work\n\nAnother work email."
+        )
+        live = self.classifier.classify(test_email, return_all_scores=True)
+
+        self.classifier.freeze()
+        assert self.classifier.is_frozen
+        frozen = self.classifier.classify(test_email, return_all_scores=True)
+        assert frozen.all_scores == pytest.approx(live.all_scores)
+
+        self.classifier.train_category("work", [test_email])
+        assert not self.classifier.is_frozen
+
     def test_get_category_stats(self):
         """Test getting statistics for a category."""
         # Train a category
@@ -228,10 +283,11 @@ class TestMultiCategoryFilter:
 class TestFolderBasedClassifier:
     """Test cases for FolderBasedClassifier."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_folders(self, tmp_path):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.base_path = Path(self.temp_dir) / "emails"
+        self.temp_dir = tmp_path
+        self.base_path = tmp_path / "emails"
         self.base_path.mkdir()
 
         # Create test folder structure
@@ -260,12 +316,6 @@ class TestFolderBasedClassifier:
                 email_file = category_path / f"email_{i+1}.txt"
                 email_file.write_text(email_content)
 
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
-
     def test_folder_discovery(self):
         """Test automatic folder discovery."""
         classifier = FolderBasedClassifier(self.base_path)
@@ -289,6 +339,46 @@ class TestFolderBasedClassifier:
                 assert isinstance(results[category], CategoryTrainingResult)
                 assert results[category].messages_processed > 0
 
+    def test_train_from_folders_skips_directories(self):
+        """Test entries named like emails but not regular files are ignored."""
+        (self.base_path / "work" / "archive.eml").mkdir()
+
+        with FolderBasedClassifier(self.base_path) as classifier:
+            results = classifier.train_from_folders()
+
+        assert results["work"].messages_processed == 2
+
+    def test_train_from_folders_parallel(self):
+        """Test process-pool training matches serial training."""
+        serial_db = Path(self.temp_dir) / "serial_db"
+        parallel_db = Path(self.temp_dir) / "parallel_db"
+
+        with FolderBasedClassifier(self.base_path, serial_db) as classifier:
+            serial = classifier.train_from_folders()
+            serial_words = classifier.classifier.export_category("work")
+
+        with FolderBasedClassifier(self.base_path, parallel_db) as classifier:
+            parallel = classifier.train_from_folders(max_workers=2)
+            parallel_words = classifier.classifier.export_category("work")
+
+        assert parallel == serial
+        assert parallel_words == serial_words
+
+    def test_train_from_folders_single_cpu_is_serial(self, monkeypatch):
+        """Test no process pool is started when only one CPU is available."""
+        import mailprobe.multi_category as multi_category
+
+        def no_pool(*args, **kwargs):
+            raise AssertionError("process pool should not be used")
+
+        monkeypatch.setattr(multi_category.os, "cpu_count", lambda: 1)
+        monkeypatch.setattr(multi_category, "ProcessPoolExecutor", no_pool)
+
+        with FolderBasedClassifier(self.base_path) as classifier:
+            results = classifier.train_from_folders(max_workers=4)
+
+        assert set(results) == set(self.categories)
+
     def test_classify_email(self):
         """Test classifying an email."""
         with FolderBasedClassifier(self.base_path) as classifier:
@@ -431,15 +521,10 @@ class TestCategoryTrainingResult:
 class TestConvenienceFunctions:
     """Test cases for convenience functions."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_dir(self, tmp_path):
         """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-
-        shutil.rmtree(self.temp_dir)
+        self.temp_dir = tmp_path
 
     def test_classify_into_categories(self):
         """Test classify_into_categories convenience function."""
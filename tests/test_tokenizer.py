@@ -2,193 +2,275 @@
 
 import pytest
 
+from mailprobe import tokenizer as tokenizer_module
 from mailprobe.message import EmailMessage
 from mailprobe.tokenizer import EmailTokenizer, Token
 
 
-class TestEmailTokenizer:
-    """Test cases for EmailTokenizer."""
+@pytest.fixture(scope="module")
+def tokenizer():
+    """Tokenizer with the default settings, shared by the module."""
+    return EmailTokenizer()
+
+
+@pytest.fixture(scope="module")
+def phrase_tokenizer():
+    """Tokenizer generating two-word phrases."""
+    return EmailTokenizer(max_phrase_terms=2)
+
+
+@pytest.fixture(scope="module")
+def length_tokenizer():
+    """Tokenizer keeping terms of 5 to 10 characters."""
+    return EmailTokenizer(min_term_length=5, max_term_length=10)
+
+
+@pytest.fixture(scope="module")
+def non_ascii_tokenizer():
+    """Tokenizer replacing non-ASCII characters and keeping short terms."""
+    return EmailTokenizer(replace_non_ascii="z", min_term_length=1)
+
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.tokenizer = EmailTokenizer()
+@pytest.fixture(scope="module")
+def header_only_tokenizer():
+    """Tokenizer that ignores message bodies."""
+    return EmailTokenizer(ignore_body=True)
 
-    def test_basic_tokenization(self):
-        """Test basic word tokenization."""
-        message = EmailMessage(
-            """From: test@example.com
+
+# Test corpora, parsed once at import. Tests only read them, and
+# EmailMessage.get_tokens keeps their tokens per tokenizer configuration.
+MSG_BASIC = EmailMessage(
+    """From: test@example.com
 To: user@example.com
 Subject: Test message
 
 This is a test message with some words.
 """
-        )
-
-        tokens = self.tokenizer.tokenize_message(message)
-
-        # Should have tokens from headers and body
-        assert len(tokens) > 0
-
-        # Check for expected tokens
-        token_texts = [token.text for token in tokens]
-        assert "test" in token_texts
-        assert "message" in token_texts
-        # Note: "words" might be filtered out due to min_term_length, so check for "some" instead
-        assert "some" in token_texts
+)
 
-    def test_header_prefixes(self):
-        """Test that header tokens get proper prefixes."""
-        message = EmailMessage(
-            """From: sender@example.com
+MSG_HEADERS = EmailMessage(
+    """From: sender@example.com
 Subject: Important message
 
 Body content here.
 """
-        )
+)
 
-        tokens = self.tokenizer.tokenize_message(message)
+MSG_HTML = EmailMessage(
+    """Subject: HTML message
+
+<html><body>
+<p>This is <b>bold</b> text.</p>
+<a href="http://example.com">Link</a>
+</body></html>
+"""
+)
 
-        # Find tokens with header prefixes
-        header_tokens = [token for token in tokens if token.prefix]
-        assert len(header_tokens) > 0
+MSG_URL = EmailMessage(
+    """Subject: URLs
 
-        # Check for expected prefixes
-        prefixes = [token.prefix for token in header_tokens]
-        assert "HFrom" in prefixes
-        assert "HSubject" in prefixes
+Visit http://example.com or www.test.org for more info.
+"""
+)
 
-    def test_phrase_generation(self):
-        """Test multi-word phrase generation."""
-        tokenizer = EmailTokenizer(max_phrase_terms=2)
-        message = EmailMessage(
-            """Subject: Free money offer
+MSG_PHRASE = EmailMessage(
+    """Subject: Free money offer
 
 Get free money now!
 """
-        )
+)
 
-        tokens = tokenizer.tokenize_message(message)
+MSG_LENGTH = EmailMessage(
+    """Subject: Test
 
-        # Should have both single words and phrases
-        phrases = [token for token in tokens if token.is_phrase()]
-        assert len(phrases) > 0
+a bb ccc dddd eeeee ffffff ggggggg hhhhhhhh iiiiiiiii jjjjjjjjjj kkkkkkkkkkk
+"""
+)
 
-        # Check for expected phrases
-        phrase_texts = [token.text for token in phrases]
-        assert any("free money" in phrase for phrase in phrase_texts)
+MSG_NON_ASCII = EmailMessage(
+    """Subject: Tëst mëssagë
 
-    def test_html_removal(self):
-        """Test HTML tag removal."""
-        message = EmailMessage(
-            """Subject: HTML message
+Hëllö wörld!
+"""
+)
 
-<html><body>
-<p>This is <b>bold</b> text.</p>
-<a href="http://example.com">Link</a>
-</body></html>
+MSG_HEADER_ONLY = EmailMessage(
+    """Subject: Header only
+
+This body content should be ignored.
 """
-        )
+)
+
+# Messages tokenized with the default settings, with the token keys that
+# must and must not appear among the results
+TOKENIZE_CASES = [
+    pytest.param(MSG_BASIC, {"test", "message", "some"}, set(), id="basic"),
+    pytest.param(
+        MSG_HEADERS,
+        {"HFrom_sender", "HSubject_important"},
+        set(),
+        id="header-prefixes",
+    ),
+    pytest.param(
+        MSG_HTML, {"bold", "this"}, {"<html>", "<body>", "<p>"}, id="html-removal"
+    ),
+    pytest.param(
+        MSG_URL, {"URL_example.com", "URL_test.org"}, set(), id="url-extraction"
+    ),
+]
 
-        tokens = self.tokenizer.tokenize_message(message)
 
-        # Should not have HTML tags as tokens
-        token_texts = [token.text for token in tokens]
-        assert "<html>" not in token_texts
-        assert "<body>" not in token_texts
-        assert "<p>" not in token_texts
+class TestEmailTokenizer:
+    """Test cases for EmailTokenizer."""
 
-        # Should have the text content
-        assert "bold" in token_texts
-        # "text." might be tokenized with punctuation, so check for "this" instead
-        assert "this" in token_texts
+    @pytest.mark.parametrize("message, present, absent", TOKENIZE_CASES)
+    def test_tokenize_message(self, tokenizer, message, present, absent):
+        """Test the expected token keys are produced for a message."""
+        tokens = message.get_tokens(tokenizer)
+        keys = {token.get_key() for token in tokens}
 
-    def test_url_extraction(self):
-        """Test URL extraction and tokenization."""
-        message = EmailMessage(
-            """Subject: URLs
+        assert present - keys == set()
+        assert absent & keys == set()
 
-Visit http://example.com or www.test.org for more info.
-"""
-        )
+    def test_derived_header_prefix_shared(self, tokenizer):
+        """Test headers without a fixed prefix share one derived prefix."""
+        first = tokenizer.tokenize_message(EmailMessage("X-Custom: alpha\n\nBody"))
+        second = tokenizer.tokenize_message(EmailMessage("X-Custom: bravo\n\nBody"))
 
-        tokens = self.tokenizer.tokenize_message(message)
+        assert first[0].get_key() == "HX-Custom_alpha"
+        assert second[0].get_key() == "HX-Custom_bravo"
+        assert first[0].prefix is second[0].prefix
 
-        # Should have URL tokens
-        url_tokens = [token for token in tokens if token.is_url()]
-        assert len(url_tokens) > 0
+    def test_derived_header_prefixes_bounded(self, tokenizer, monkeypatch):
+        """Test derived prefixes are kept for a bounded number of headers."""
+        monkeypatch.setattr(tokenizer_module, "_DERIVED_PREFIXES", {})
+        monkeypatch.setattr(tokenizer_module, "_MAX_DERIVED_PREFIXES", 2)
 
-        # Check for expected URL components
-        url_texts = [token.text for token in url_tokens]
-        assert "example.com" in url_texts or "test.org" in url_texts
+        headers = "".join(f"X-H{i}: value\n" for i in range(5))
+        tokens = tokenizer.tokenize_message(EmailMessage(f"{headers}\nBody"))
 
-    def test_term_length_filtering(self):
-        """Test filtering of terms by length."""
-        tokenizer = EmailTokenizer(min_term_length=5, max_term_length=10)
-        message = EmailMessage(
-            """Subject: Test
+        assert {t.prefix for t in tokens if t.prefix} == {f"HX-H{i}" for i in range(5)}
+        assert len(tokenizer_module._DERIVED_PREFIXES) == 2
 
-a bb ccc dddd eeeee ffffff ggggggg hhhhhhhh iiiiiiiii jjjjjjjjjj kkkkkkkkkkk
-"""
-        )
+    def test_custom_header_prefix(self):
+        """Test header prefixes can be customized per tokenizer."""
+        custom = EmailTokenizer()
+        custom.header_prefixes["x-custom"] = "HCustom"
 
-        tokens = tokenizer.tokenize_message(message)
+        tokens = custom.tokenize_message(EmailMessage("X-Custom: alpha\n\nBody"))
+        assert tokens[0].get_key() == "HCustom_alpha"
+        assert "x-custom" not in EmailTokenizer().header_prefixes
 
-        # Check that only terms of appropriate length are included
-        for token in tokens:
-            if not token.is_phrase():
-                assert len(token.text) >= 5
-                assert len(token.text) <= 10
+    def test_custom_header_prefix_token_cache(self):
+        """Test cached tokens are not shared with customized prefixes."""
+        message = EmailMessage("X-Custom: alpha\n\nBody")
+        custom = EmailTokenizer()
+        custom.header_prefixes["x-custom"] = "HCustom"
+
+        default_tokens = message.get_tokens(EmailTokenizer())
+        custom_tokens = message.get_tokens(custom)
+
+        assert default_tokens[0].get_key() == "HX-Custom_alpha"
+        assert custom_tokens[0].get_key() == "HCustom_alpha"
+        assert message.get_tokens(EmailTokenizer()) is default_tokens
+
+    def test_phrase_generation(self, phrase_tokenizer):
+        """Test multi-word phrase generation."""
+        tokens = MSG_PHRASE.get_tokens(phrase_tokenizer)
+
+        # Should have both single words and phrases
+        phrases = [token for token in tokens if token.is_phrase()]
+        assert len(phrases) > 0
 
-    def test_non_ascii_replacement(self):
+        # Check for expected phrases
+        phrase_texts = {token.text for token in phrases}
+        assert "free money" in phrase_texts
+
+    @pytest.mark.parametrize("max_terms", [2, 3, 4])
+    def test_phrase_lengths(self, max_terms):
+        """Test phrases of every length up to max_phrase_terms, in order."""
+        tokens = MSG_PHRASE.get_tokens(EmailTokenizer(max_phrase_terms=max_terms))
+        body_phrases = [t.text for t in tokens if t.is_phrase() and not t.prefix]
+
+        words = ["get", "free", "money", "now"]
+        expected = [
+            " ".join(words[start : start + length])
+            for start in range(len(words))
+            for length in range(2, max_terms + 1)
+            if start + length <= len(words)
+        ]
+        assert body_phrases == expected
+
+    def test_term_length_filtering(self, length_tokenizer):
+        """Test filtering of terms by length."""
+        tokens = MSG_LENGTH.get_tokens(length_tokenizer)
+
+        # Check that only terms of appropriate length are included
+        wrong_length = [
+            token
+            for token in tokens
+            if not token.is_phrase() and not 5 <= len(token.text) <= 10
+        ]
+        assert not wrong_length, wrong_length
+
+    def test_non_ascii_replacement(self, non_ascii_tokenizer):
         """Test non-ASCII character replacement."""
-        tokenizer = EmailTokenizer(
-            replace_non_ascii="z", min_term_length=1
-        )  # Lower min length
-        message = EmailMessage(
-            """Subject: Tëst mëssagë
+        tokens = MSG_NON_ASCII.get_tokens(non_ascii_tokenizer)
 
-Hëllö wörld!
-"""
-        )
+        # Non-ASCII characters should be replaced
+        token_texts = {token.text for token in tokens}
+        # Words with 'z' replacements (after filtering by length)
+        z_texts = {text for text in token_texts if "z" in text}
+        # Or the actual tokens we see (filtered versions)
+        expected_tokens = {"tzst", "mzssagz", "hzllz", "wzrld", "ssag", "rld"}
+
+        assert z_texts or expected_tokens & token_texts
+
+    def test_remove_html_unclosed_tags(self, tokenizer):
+        """Test text after the last closing bracket is kept as is."""
+        assert tokenizer._remove_html("a <b>bold</b> <x tail") == "a bold <x tail"
+        # Many unclosed brackets must not make tag removal quadratic
+        unclosed = "<" * 100_000
+        assert tokenizer._remove_html(f"<p>text</p>{unclosed}") == f"text {unclosed}"
+
+    def test_extract_urls_long_runs(self, tokenizer):
+        """Test URL extraction stays linear on long runs without a dot."""
+        assert tokenizer._extract_urls("a" * 100_000) == []
+        tokens = tokenizer._extract_urls(f"{'a' * 100_000} www.test.org")
+        assert [token.get_key() for token in tokens] == ["URL_test.org"]
+
+    def test_tokenize_large_body(self, tokenizer):
+        """Test a large plain-text body is tokenized without decoding copies."""
+        body = " ".join(f"term{i % 5000}, word{i % 700}." for i in range(10_000))
+        message = EmailMessage(f"Subject: Large message\n\n{body}\n")
+        message_body = message.body
+
+        # Text with no quoted-printable escape is returned as is
+        assert tokenizer._decode_body(message_body) is message_body
 
         tokens = tokenizer.tokenize_message(message)
+        assert len(tokens) == 40_002
 
-        # Non-ASCII characters should be replaced
-        token_texts = [token.text for token in tokens]
-        # Check for words with 'z' replacements (after filtering by length)
-        has_z_replacement = any("z" in text for text in token_texts)
-        # Or check for the actual tokens we see (filtered versions)
-        expected_tokens = [
-            "tzst",
-            "mzssagz",
-            "hzllz",
-            "wzrld",
-            "ssag",
-            "rld",
-        ]  # Include filtered versions
-        has_expected = any(text in expected_tokens for text in token_texts)
-
-        assert has_z_replacement or has_expected
-
-    def test_ignore_body(self):
-        """Test ignoring message body."""
-        tokenizer = EmailTokenizer(ignore_body=True)
-        message = EmailMessage(
-            """Subject: Header only
+    def test_normalize_term(self, non_ascii_tokenizer):
+        """Test terms are lowercased and non-ASCII characters replaced."""
+        assert non_ascii_tokenizer._normalize_term("Path") == "path"
+        assert non_ascii_tokenizer._normalize_term("Pfäde") == "pfzde"
 
-This body content should be ignored.
-"""
-        )
+    def test_word_case_folding(self, tokenizer):
+        """Test words are lowercased without matching case-folded non-ASCII."""
+        assert tokenizer._extract_words("Hello WORLD") == ["hello", "world"]
+        # KELVIN SIGN lowercases to an ASCII "k" but is not itself a word char
+        assert tokenizer._extract_words("\u212aelvin Café") == ["elvin", "caf"]
 
-        tokens = tokenizer.tokenize_message(message)
+    def test_ignore_body(self, header_only_tokenizer):
+        """Test ignoring message body."""
+        tokens = MSG_HEADER_ONLY.get_tokens(header_only_tokenizer)
 
         # Should only have header tokens
-        body_tokens = [token for token in tokens if token.flags & Token.FLAG_BODY]
-        assert len(body_tokens) == 0
+        assert not any(token.flags & Token.FLAG_BODY for token in tokens)
 
         # Should have header tokens
-        header_tokens = [token for token in tokens if token.flags & Token.FLAG_HEADER]
-        assert len(header_tokens) > 0
+        assert any(token.flags & Token.FLAG_HEADER for token in tokens)
 
 
 class TestToken:
@@ -226,3 +308,6 @@ class TestToken:
         # Token without prefix
         token2 = Token("word", Token.FLAG_WORD)
         assert token2.get_key() == "word"
+
+        # Repeated calls return the same key object
+        assert token1.get_key() is token1.get_key()